@@ -3,6 +3,7 @@
 __version__ = "1.1.0"
 
 from pii_shield.scanner import Scanner
-from pii_shield.models import PIIMatch, ScanResult, MaskingStrategy
+from pii_shield.async_scanner import AsyncScanner
+from pii_shield.models import PIIMatch, MatchTable, ScanResult, BatchScanResult, MaskingStrategy
 
-__all__ = ["Scanner", "PIIMatch", "ScanResult", "MaskingStrategy", "__version__"]
+__all__ = ["Scanner", "AsyncScanner", "PIIMatch", "MatchTable", "ScanResult", "BatchScanResult", "MaskingStrategy", "__version__"]
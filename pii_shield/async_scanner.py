@@ -0,0 +1,192 @@
+"""asyncio front end for the scanner."""
+
+import asyncio
+import functools
+import io
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import IO, Any, Dict, List, Optional
+
+from pii_shield.models import ScanResult
+from pii_shield.scanner import SNIFF_SIZE, Scanner
+
+# Texts up to this many characters are scanned directly on the event loop
+DEFAULT_INLINE_THRESHOLD = 4096
+# Characters scanned between cancellation checks in executor threads
+CANCEL_CHECK_SIZE = 256 * 1024
+
+
+class _Cancelled(Exception):
+    """Raised inside an executor thread once its caller has been cancelled."""
+
+
+class _CancellableReader:
+    """Text stream that stops a scan_stream run when its event is set."""
+
+    def __init__(self, fileobj: IO[str], cancelled: threading.Event):
+        self.fileobj = fileobj
+        self.cancelled = cancelled
+
+    def read(self, size: int = -1) -> str:
+        if self.cancelled.is_set():
+            raise _Cancelled()
+        return self.fileobj.read(size)
+
+
+class AsyncScanner:
+    """
+    Scans text, files and directories without blocking the event loop.
+
+    Small texts are scanned inline, since handing them to an executor costs
+    more than scanning them. Everything else runs on ``executor`` (the
+    loop's default thread pool if None), with at most ``max_concurrency``
+    scans in flight per AsyncScanner.
+
+    Cancelling a coroutine stops its work as well as the await: thread
+    scans check for cancellation every CANCEL_CHECK_SIZE characters, and
+    directory scans stop scheduling files. With a ProcessPoolExecutor,
+    queued files are dropped but a scan already running in a worker
+    finishes there and its result is discarded.
+    """
+
+    def __init__(self, scanner: Optional[Scanner] = None, executor: Optional[Executor] = None,
+                 max_concurrency: int = 4, inline_threshold: int = DEFAULT_INLINE_THRESHOLD,
+                 **scanner_options: Any):
+        """
+        Args:
+            scanner: Scanner to use; built from ``scanner_options`` if None
+            executor: Executor for large scans (default: the loop's thread pool)
+            max_concurrency: Maximum number of scans running in the executor
+            inline_threshold: Largest text, in characters, scanned on the loop
+            **scanner_options: Scanner constructor arguments
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.scanner = scanner if scanner is not None else Scanner(**scanner_options)
+        self.executor = executor
+        self.max_concurrency = max_concurrency
+        self.inline_threshold = inline_threshold
+        # Created on first use so it binds to the running loop
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def scan_text(self, text: str, filename: str = "<input>") -> ScanResult:
+        """Scan text for PII, inline if it is small and in the executor otherwise."""
+        if len(text) <= self.inline_threshold:
+            return self.scanner.scan_text(text, filename)
+        return await self._run(_scan_text, text, filename)
+
+    async def scan_file(self, filepath: str) -> ScanResult:
+        """Scan a file for PII in the executor."""
+        return await self._run(_scan_file, filepath)
+
+    async def scan_directory(self, dirpath: str) -> List[ScanResult]:
+        """
+        Scan all files in a directory concurrently.
+
+        Args:
+            dirpath: Directory to scan recursively
+
+        Returns:
+            Results for files containing PII, in path order
+        """
+        loop = asyncio.get_running_loop()
+        paths = await loop.run_in_executor(self.executor, self.scanner._walk, dirpath)
+        tasks = [asyncio.ensure_future(self._run(_scan_candidate, path)) for path in paths]
+        try:
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        return [result for result in results if result.matches]
+
+    async def _run(self, func, *args: Any) -> ScanResult:
+        """Run a scan helper in the executor within the concurrency limit."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        loop = asyncio.get_running_loop()
+
+        async with self._semaphore:
+            if isinstance(self.executor, ProcessPoolExecutor):
+                call = functools.partial(_run_in_process, self.scanner.options, func.__name__, *args)
+                return await loop.run_in_executor(self.executor, call)
+
+            cancelled = threading.Event()
+            call = functools.partial(func, self.scanner, *args, cancelled=cancelled)
+            try:
+                return await loop.run_in_executor(self.executor, call)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+
+def _scan_text(scanner: Scanner, text: str, filename: str,
+               cancelled: Optional[threading.Event] = None) -> ScanResult:
+    """Scan text, in pieces that can be abandoned if ``cancelled`` is set."""
+    if cancelled is None or len(text) <= CANCEL_CHECK_SIZE:
+        return scanner.scan_text(text, filename)
+    reader = _CancellableReader(io.StringIO(text), cancelled)
+    try:
+        matches = list(scanner.scan_stream(reader, chunk_size=CANCEL_CHECK_SIZE))
+    except _Cancelled:
+        return ScanResult(file=filename, matches=[], summary={})
+    return ScanResult(file=filename, matches=matches, summary=scanner._summarize(matches))
+
+
+def _scan_file(scanner: Scanner, filepath: str,
+               cancelled: Optional[threading.Event] = None) -> ScanResult:
+    """
+    Scan a file, in pieces that can be abandoned if ``cancelled`` is set.
+
+    Errors such as an unreadable file propagate; only a cancelled scan
+    ends with no matches.
+    """
+    with open(filepath, 'rb') as f:
+        if cancelled is None or scanner.use_mmap:
+            return scanner._scan_open(f, filepath, compact=False)
+        return _scan_stream(scanner, f, filepath, cancelled)
+
+
+def _scan_candidate(scanner: Scanner, filepath: str,
+                    cancelled: Optional[threading.Event] = None) -> ScanResult:
+    """
+    Scan a file found in a directory, as _scan_file does.
+
+    As in Scanner.scan_directory, a file that cannot be opened or is
+    binary has no matches; errors while scanning it propagate.
+    """
+    try:
+        f = open(filepath, 'rb')
+    except OSError:
+        return ScanResult(file=filepath, matches=[], summary={})
+    with f:
+        if scanner._is_binary(f.read(SNIFF_SIZE)):
+            return ScanResult(file=filepath, matches=[], summary={})
+        f.seek(0)
+        if cancelled is None or scanner.use_mmap:
+            return scanner._scan_detached(f, filepath)
+        return _scan_stream(scanner, f, filepath, cancelled)
+
+
+def _scan_stream(scanner: Scanner, f: IO[bytes], filepath: str, cancelled: threading.Event) -> ScanResult:
+    """Scan an open binary file in pieces, with no matches if ``cancelled`` is set meanwhile."""
+    text = io.TextIOWrapper(f, encoding=scanner.encoding, errors='ignore')
+    try:
+        matches = list(scanner.scan_stream(_CancellableReader(text, cancelled), chunk_size=CANCEL_CHECK_SIZE))
+    except _Cancelled:
+        matches = []
+    return ScanResult(file=filepath, matches=matches, summary=scanner._summarize(matches))
+
+
+# Scanners built in worker processes, keyed by their options
+_process_scanners: Dict[Any, Scanner] = {}
+
+
+def _run_in_process(options: Dict[str, Any], name: str, *args: Any) -> ScanResult:
+    """Run a scan helper in a worker process with a scanner built from options."""
+    key = repr(sorted(options.items()))
+    scanner = _process_scanners.get(key)
+    if scanner is None:
+        scanner = _process_scanners[key] = Scanner(**options)
+    return globals()[name](scanner, *args)
@@ -0,0 +1,327 @@
+"""Reproducible throughput benchmarks on synthetic corpora."""
+
+import json
+import platform
+import random
+import string
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from pii_shield import __version__
+from pii_shield.formatters import TextFormatter, JSONFormatter, NDJSONFormatter, CSVFormatter
+from pii_shield.scanner import Scanner
+
+# Corpus kinds, in report order
+CORPORA = ("logs", "source", "csv", "jsonl", "dense", "adversarial")
+# Stages timed separately on top of the end-to-end scan
+STAGES = ("regex", "validators", "context", "tokenizer", "formatters")
+# Allowed relative slowdown or memory growth before compare() reports it
+DEFAULT_TOLERANCE = 0.10
+
+_WORDS = ("the", "request", "user", "session", "cache", "timeout", "retry", "payload",
+          "service", "queue", "record", "update", "status", "value", "order", "account")
+_NAMES = ("alice", "bob", "carol", "dave", "erin", "frank", "grace", "heidi")
+
+
+class _Values:
+    """Deterministic generator of fake PII values."""
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+
+    def digits(self, n: int) -> str:
+        return ''.join(self.rng.choice(string.digits) for _ in range(n))
+
+    def email(self) -> str:
+        return f"{self.rng.choice(_NAMES)}.{self.digits(3)}@example.com"
+
+    def ssn(self) -> str:
+        return f"{self.rng.randint(100, 665)}-{self.rng.randint(10, 99)}-{self.rng.randint(1000, 9999)}"
+
+    def phone(self) -> str:
+        return f"({self.rng.randint(200, 999)}) {self.rng.randint(200, 999)}-{self.digits(4)}"
+
+    def ip(self) -> str:
+        return '.'.join(str(self.rng.randint(1, 254)) for _ in range(4))
+
+    def credit_card(self) -> str:
+        digits = [4] + [int(d) for d in self.digits(14)]
+        total = 0
+        for i, d in enumerate(reversed(digits)):
+            if i % 2 == 0:
+                d = d * 2 - 9 if d > 4 else d * 2
+            total += d
+        digits.append((10 - total % 10) % 10)
+        return ''.join(map(str, digits))
+
+    def aws_key(self) -> str:
+        return "AKIA" + ''.join(self.rng.choice(string.ascii_uppercase + string.digits) for _ in range(16))
+
+    def openai_key(self) -> str:
+        return "sk-" + ''.join(self.rng.choice(string.ascii_letters + string.digits) for _ in range(48))
+
+    def any(self) -> str:
+        return self.rng.choice((self.email, self.ssn, self.phone, self.ip, self.credit_card,
+                                self.aws_key, self.openai_key))()
+
+    def words(self, n: int) -> str:
+        return ' '.join(self.rng.choice(_WORDS) for _ in range(n))
+
+
+def _log_line(v: _Values, i: int) -> str:
+    level = v.rng.choice(("INFO", "INFO", "INFO", "WARN", "DEBUG", "ERROR"))
+    message = v.words(v.rng.randint(4, 12))
+    if v.rng.random() < 0.05:
+        message += f" user={v.email()}"
+    return (f"2024-01-{1 + i % 28:02d}T{i % 24:02d}:{i % 60:02d}:{(i * 7) % 60:02d}.{i % 1000:03d}Z "
+            f"{level} [worker-{i % 8}] id={i:08x} {message} took {v.rng.randint(1, 999)}ms")
+
+
+def _source_line(v: _Values, i: int) -> str:
+    indent = '    ' * v.rng.randint(0, 3)
+    roll = v.rng.random()
+    if roll < 0.01:
+        return f'{indent}API_KEY = "{v.rng.choice((v.aws_key, v.openai_key))()}"'
+    if roll < 0.3:
+        return f"{indent}# {v.words(v.rng.randint(3, 10))}"
+    if roll < 0.6:
+        return f"{indent}def {v.rng.choice(_WORDS)}_{i}(self, {v.rng.choice(_WORDS)}, timeout={v.rng.randint(1, 60)}):"
+    return f"{indent}{v.rng.choice(_WORDS)} = self.{v.rng.choice(_WORDS)}[{v.rng.randint(0, 9)}] + {i}"
+
+
+def _csv_line(v: _Values, i: int) -> str:
+    if i == 0:
+        return "id,name,email,phone,ssn,amount,note"
+    return (f"{i},{v.rng.choice(_NAMES).title()},{v.email()},{v.phone()},{v.ssn()},"
+            f"{v.rng.randint(1, 99999) / 100:.2f},{v.words(3)}")
+
+
+def _jsonl_line(v: _Values, i: int) -> str:
+    record = {"id": i, "event": v.rng.choice(_WORDS), "message": v.words(v.rng.randint(5, 15))}
+    if v.rng.random() < 0.2:
+        record["contact"] = v.email()
+    if v.rng.random() < 0.05:
+        record["card"] = v.credit_card()
+    return json.dumps(record)
+
+
+def _dense_line(v: _Values, i: int) -> str:
+    return ' '.join(f"{v.rng.choice(('SSN:', 'email', 'card', 'ip', 'key', 'phone'))} {v.any()}"
+                    for _ in range(v.rng.randint(2, 5)))
+
+
+def _adversarial_line(v: _Values, i: int) -> str:
+    kind = i % 6
+    if kind == 0:
+        # Long digit runs: every position starts a numeric candidate
+        return v.digits(v.rng.randint(200, 2000))
+    if kind == 1:
+        # Email-like fragments that never complete
+        return ' '.join('a' * v.rng.randint(1, 40) + '@' for _ in range(50))
+    if kind == 2:
+        # Digits and dashes that almost form SSNs and phone numbers
+        return '-'.join(v.digits(v.rng.randint(1, 4)) for _ in range(300))
+    if kind == 3:
+        # Key prefixes without valid bodies
+        return ' '.join(v.rng.choice(("sk-", "AKIA", "ghp_", "eyJ")) + v.words(1) for _ in range(100))
+    if kind == 4:
+        # Dotted numbers that almost form IP addresses
+        return ' '.join('.'.join(v.digits(v.rng.randint(1, 4)) for _ in range(5)) for _ in range(80))
+    # One very long line without breaks
+    return v.words(2000)
+
+
+_LINE_MAKERS: Dict[str, Callable[[_Values, int], str]] = {
+    "logs": _log_line,
+    "source": _source_line,
+    "csv": _csv_line,
+    "jsonl": _jsonl_line,
+    "dense": _dense_line,
+    "adversarial": _adversarial_line,
+}
+
+
+def generate_corpus(kind: str, size: int, seed: int = 0) -> str:
+    """
+    Generate a synthetic corpus.
+
+    The same kind, size and seed always produce the same text.
+
+    Args:
+        kind: One of CORPORA
+        size: Approximate length in characters
+        seed: Random seed
+
+    Returns:
+        Text of whole lines, at least ``size`` characters long
+    """
+    if kind not in _LINE_MAKERS:
+        raise ValueError(f"Unknown corpus: {kind}")
+    make_line = _LINE_MAKERS[kind]
+    values = _Values(random.Random(f"{kind}:{seed}"))
+    lines = []
+    length = 0
+    while length < size:
+        line = make_line(values, len(lines))
+        lines.append(line)
+        length += len(line) + 1
+    return '\n'.join(lines) + '\n'
+
+
+def _best_time(func: Callable[[], object], repeat: int) -> float:
+    """Return the fastest of ``repeat`` runs of func, in seconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _score_context(scanner: Scanner, text: str, hits: List[Tuple[str, int, int]]) -> List[int]:
+    """Run context analysis over every hit the way scan_text does."""
+    index = scanner.context_analyzer.index(text)
+    return [scanner.context_analyzer.analyze_context(text, s, e, t, index) for t, s, e in hits]
+
+
+def measure(scanner: Scanner, text: str, repeat: int = 3) -> Dict[str, object]:
+    """
+    Benchmark scanning one text.
+
+    The full scan_text is timed end to end. Each stage is then timed on its
+    own over the same pattern hits, so the stage times show where the scan
+    spends its time without instrumenting the scanner itself.
+
+    Args:
+        scanner: Scanner to benchmark
+        text: Text to scan
+        repeat: Runs per measurement; the fastest is kept
+
+    Returns:
+        Dict with size, match counts, timings and peak memory
+    """
+    result = scanner.scan_text(text, "<bench>")
+    seconds = _best_time(lambda: scanner.scan_text(text, "<bench>"), repeat)
+
+    hits = list(scanner.engine.finditer(text))
+    formatters = (TextFormatter(), JSONFormatter(), NDJSONFormatter(), CSVFormatter())
+    stages = {
+        "regex": _best_time(lambda: list(scanner.engine.finditer(text)), repeat),
+        "validators": _best_time(lambda: scanner._validator_adjustments(text, hits), repeat),
+        "context": _best_time(lambda: _score_context(scanner, text, hits), repeat),
+        "tokenizer": _best_time(lambda: [scanner.tokenizer.get_context_window(text, s, e)
+                                         for _, s, e in hits], repeat),
+        "formatters": _best_time(lambda: [f.format([result]) for f in formatters], repeat),
+    }
+
+    tracemalloc.start()
+    try:
+        scanner.scan_text(text, "<bench>")
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    nbytes = len(text.encode('utf-8'))
+    return {
+        "bytes": nbytes,
+        "hits": len(hits),
+        "matches": len(result.matches),
+        "seconds": seconds,
+        "mb_per_s": nbytes / (1024 * 1024) / seconds if seconds else 0.0,
+        "matches_per_s": len(result.matches) / seconds if seconds else 0.0,
+        "stages": stages,
+        "peak_memory": peak_memory,
+    }
+
+
+def run_benchmark(size: int = 1024 * 1024, corpora: Optional[Sequence[str]] = None,
+                  seed: int = 0, repeat: int = 3, threshold: int = 70) -> Dict[str, object]:
+    """
+    Run the benchmark over each corpus.
+
+    Args:
+        size: Characters per corpus
+        corpora: Corpus kinds to run (default: all of CORPORA)
+        seed: Corpus seed
+        repeat: Runs per measurement
+        threshold: Scanner confidence threshold
+
+    Returns:
+        JSON-serializable results, suitable for save_results() and compare()
+    """
+    scanner = Scanner(threshold=threshold)
+    results = {}
+    for kind in corpora or CORPORA:
+        results[kind] = measure(scanner, generate_corpus(kind, size, seed), repeat)
+    return {
+        "version": __version__,
+        "python": platform.python_version(),
+        "size": size,
+        "seed": seed,
+        "threshold": threshold,
+        "corpora": results,
+    }
+
+
+def save_results(results: Dict[str, object], path: str) -> None:
+    """Write benchmark results as JSON."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+        f.write('\n')
+
+
+def load_results(path: str) -> Dict[str, object]:
+    """Read benchmark results written by save_results()."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare(current: Dict[str, object], baseline: Dict[str, object],
+            tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """
+    Compare benchmark results against a baseline.
+
+    Corpora are only compared when both runs used the same size and seed,
+    since the corpus text depends on both.
+
+    Args:
+        current: Results of this run
+        baseline: Stored results to compare against
+        tolerance: Allowed relative slowdown or memory growth
+
+    Returns:
+        One message per regression; empty if there are none
+    """
+    if (current["size"], current["seed"]) != (baseline["size"], baseline["seed"]):
+        return [f"baseline used size={baseline['size']} seed={baseline['seed']}, "
+                f"this run size={current['size']} seed={current['seed']}"]
+
+    problems = []
+    for kind, now in current["corpora"].items():
+        before = baseline["corpora"].get(kind)
+        if before is None:
+            continue
+        if now["matches"] != before["matches"]:
+            problems.append(f"{kind}: {now['matches']} matches, baseline had {before['matches']}")
+        if now["mb_per_s"] < before["mb_per_s"] * (1 - tolerance):
+            drop = 1 - now["mb_per_s"] / before["mb_per_s"]
+            problems.append(f"{kind}: {now['mb_per_s']:.2f} MB/s is {drop:.0%} below "
+                            f"baseline {before['mb_per_s']:.2f} MB/s")
+        if now["peak_memory"] > before["peak_memory"] * (1 + tolerance):
+            growth = now["peak_memory"] / before["peak_memory"] - 1
+            problems.append(f"{kind}: peak memory {now['peak_memory']} bytes is {growth:.0%} above "
+                            f"baseline {before['peak_memory']} bytes")
+    return problems
+
+
+def format_results(results: Dict[str, object]) -> str:
+    """Render benchmark results as a text table."""
+    header = f"{'corpus':<12} {'MB/s':>8} {'matches/s':>10} {'peak MB':>8}  " + \
+        ' '.join(f"{stage:>10}" for stage in STAGES)
+    lines = [header, '-' * len(header)]
+    for kind, r in results["corpora"].items():
+        stage_ms = ' '.join(f"{r['stages'][stage] * 1000:>8.1f}ms" for stage in STAGES)
+        lines.append(f"{kind:<12} {r['mb_per_s']:>8.2f} {r['matches_per_s']:>10.0f} "
+                     f"{r['peak_memory'] / (1024 * 1024):>8.1f}  {stage_ms}")
+    return '\n'.join(lines)
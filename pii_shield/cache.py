@@ -0,0 +1,177 @@
+"""Persistent scan result cache for repeated directory scans."""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import List, Optional, Tuple
+
+from pii_shield.models import ScanResult
+
+# Bytes hashed at a time when fingerprinting file contents
+_HASH_BLOCK = 1024 * 1024
+# Cache writes committed together
+_COMMIT_EVERY = 500
+# Name of the database file in the cache directory
+DB_NAME = 'scan-cache.db'
+
+
+def default_cache_dir() -> str:
+    """Return the default cache directory, honouring XDG_CACHE_HOME."""
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'pii-shield')
+
+
+def file_digest(path: str) -> str:
+    """Hash the contents of a file."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ScanCache:
+    """
+    On-disk cache of scan results for unchanged files.
+
+    Entries are keyed by absolute path and by the scanner fingerprint, which
+    covers the pattern set, threshold and validator code. A file whose size
+    and mtime match its entry is returned without being read. If only the
+    mtime changed, the file is hashed and still served from the cache when
+    its content is the same. The cache is bounded by ``max_bytes`` of stored
+    results; the least recently used entries are evicted first.
+
+    The cache is a single SQLite file and must only be used from one
+    process; scan_directory consults it in the parent before dispatching
+    work to any worker processes. Stored results include the matched
+    values and their context, so the directory is created readable by
+    its owner only (0700) and the database file likewise (0600).
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: int = 256 * 1024 * 1024):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+        db_path = os.path.join(self.cache_dir, DB_NAME)
+        # Create the file before SQLite does, which would use the umask; its journals copy this mode
+        os.close(os.open(db_path, os.O_RDWR | os.O_CREAT, 0o600))
+        os.chmod(db_path, 0o600)
+        self._conn = sqlite3.connect(db_path)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                path TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                digest TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                nbytes INTEGER NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (path, fingerprint)
+            )
+        """)
+        self._touched: List[Tuple[float, str, str]] = []
+        self._pending_writes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __enter__(self) -> "ScanCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def get(self, path: str, fingerprint: str, stat: os.stat_result) -> Optional[ScanResult]:
+        """Return the cached result for an unchanged file, or None."""
+        key = os.path.abspath(path)
+        row = self._conn.execute(
+            "SELECT size, mtime_ns, digest, payload FROM entries WHERE path = ? AND fingerprint = ?",
+            (key, fingerprint),
+        ).fetchone()
+        if row is None or row[0] != stat.st_size:
+            self.misses += 1
+            return None
+
+        size, mtime_ns, digest, payload = row
+        if mtime_ns != stat.st_mtime_ns:
+            try:
+                if file_digest(path) != digest:
+                    self.misses += 1
+                    return None
+            except OSError:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE entries SET mtime_ns = ? WHERE path = ? AND fingerprint = ?",
+                (stat.st_mtime_ns, key, fingerprint),
+            )
+            self._wrote()
+
+        self.hits += 1
+        self._touched.append((time.time(), key, fingerprint))
+        result = ScanResult.from_dict(json.loads(payload))
+        result.file = path
+        return result
+
+    def put(self, path: str, fingerprint: str, stat: os.stat_result, result: ScanResult) -> None:
+        """Store the result of scanning a file as it was at ``stat``."""
+        key = os.path.abspath(path)
+        try:
+            digest = file_digest(path)
+            current = os.stat(path)
+        except OSError:
+            return
+        if (current.st_size, current.st_mtime_ns) != (stat.st_size, stat.st_mtime_ns):
+            # Changed while being scanned; the result may not match the content
+            return
+
+        payload = json.dumps(result.to_dict(), separators=(',', ':'))
+        self._conn.execute(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, fingerprint, stat.st_size, stat.st_mtime_ns, digest, payload, len(payload), time.time()),
+        )
+        self._wrote()
+
+    def _wrote(self) -> None:
+        """Commit periodically so large scans do not hold one huge transaction."""
+        self._pending_writes += 1
+        if self._pending_writes >= _COMMIT_EVERY:
+            self.flush()
+
+    def flush(self) -> None:
+        """Record hits, evict over-budget entries and commit."""
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE entries SET last_used = ? WHERE path = ? AND fingerprint = ?",
+                self._touched,
+            )
+            self._touched = []
+        self._evict()
+        self._conn.commit()
+        self._pending_writes = 0
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the cache fits its budget."""
+        total = self._conn.execute("SELECT COALESCE(SUM(nbytes), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT rowid, nbytes FROM entries ORDER BY last_used")
+        doomed = []
+        for rowid, nbytes in rows:
+            if total <= self.max_bytes:
+                break
+            doomed.append((rowid,))
+            total -= nbytes
+        self._conn.executemany("DELETE FROM entries WHERE rowid = ?", doomed)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        self._conn.execute("DELETE FROM entries")
+        self._conn.commit()
+
+    def close(self) -> None:
+        """Flush pending writes and close the database."""
+        self.flush()
+        self._conn.close()
@@ -1,16 +1,29 @@
 """Command-line interface for pii-guard."""
 
+import codecs
+import json
+import sqlite3
 import sys
 import click
+from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import IO, Optional, Tuple
 
 from pii_shield import __version__
 from pii_shield.scanner import Scanner
-from pii_shield.masker import Masker
+from pii_shield.mirror import MANIFEST_NAME
+from pii_shield.cache import ScanCache
+from pii_shield.store import FindingsStore
+from pii_shield.gitdiff import scan_changes, toplevel
+from pii_shield.vault import TokenVault
+from pii_shield.masker import DEFAULT_HASH_LENGTH, HASH_ALGORITHMS, Masker
 from pii_shield.models import MaskingStrategy
-from pii_shield.formatters import TextFormatter, JSONFormatter, CSVFormatter
+from pii_shield.formatters import TextFormatter, JSONFormatter, NDJSONFormatter, CSVFormatter
 from pii_shield.patterns import PATTERNS, get_pattern_categories, get_pattern_info
+from pii_shield.bench import CORPORA, DEFAULT_TOLERANCE, run_benchmark, format_results, save_results, load_results, compare
+
+# Characters of input restored at a time by detokenize
+DETOKENIZE_BATCH = 1024 * 1024
 
 
 @click.group()
@@ -24,10 +37,28 @@ def cli():
 @click.argument('path', required=False)
 @click.option('--stdin', is_flag=True, help='Read from stdin')
 @click.option('--threshold', '-t', type=int, default=70, help='Confidence threshold (0-100)')
-@click.option('--format', '-f', type=click.Choice(['text', 'json', 'csv']), default='text', help='Output format')
+@click.option('--format', '-f', type=click.Choice(['text', 'json', 'ndjson', 'csv']), default='text', help='Output format')
 @click.option('--mask', '-m', type=click.Choice(['full', 'partial', 'hash', 'token']), help='Masking strategy')
 @click.option('--output', '-o', type=click.Path(), help='Output file for masked content')
 @click.option('--html', is_flag=True, help='Generate HTML report and open in browser')
+@click.option('--stream-threshold', type=int, default=64, help='Scan files larger than this many MB in chunks')
+@click.option('--mmap', 'use_mmap', is_flag=True, help='Memory-map large files and scan their bytes directly')
+@click.option('--jobs', '-j', type=int, default=1, help='Worker processes for directory scans (0 = one per CPU)')
+@click.option('--unordered', is_flag=True, help='Report directory results in completion order instead of path order')
+@click.option('--cache/--no-cache', 'use_cache', default=False, help='Reuse cached results of unchanged files in directory scans (stores matched values; off by default)')
+@click.option('--cache-dir', type=click.Path(file_okay=False), help='Directory for the scan cache with --cache (default: ~/.cache/pii-shield)')
+@click.option('--resolve-overlaps', is_flag=True, help='Report only the best of overlapping matches')
+@click.option('--alternates', is_flag=True, help='With --resolve-overlaps, list suppressed matches in JSON output')
+@click.option('--hash-key', envvar='PII_SHIELD_HASH_KEY', help='Secret key for --mask hash (default: $PII_SHIELD_HASH_KEY)')
+@click.option('--hash-length', type=int, default=DEFAULT_HASH_LENGTH, help='Hex characters of each --mask hash digest')
+@click.option('--hash-algorithm', type=click.Choice(sorted(HASH_ALGORITHMS)), help='Digest for --mask hash (default: blake2b with a key, sha256 without)')
+@click.option('--vault', type=click.Path(dir_okay=False), help='Token vault for --mask token, so tokens are stable and reversible')
+@click.option('--hardlink', is_flag=True, help='With --mask and --output on a directory, hard-link files without PII instead of copying them')
+@click.option('--store', type=click.Path(dir_okay=False), help='Also record findings in this SQLite store for pii-guard query')
+@click.option('--exclude', 'excludes', multiple=True, metavar='GLOB', help='Skip paths matching this .gitignore-style pattern in directory scans (repeatable)')
+@click.option('--gitignore', is_flag=True, help='Skip files ignored by .gitignore in directory scans')
+@click.option('--git-diff', 'git_diff', metavar='REF', help='Scan only lines added since REF (or in a REF..REF range)')
+@click.option('--staged', is_flag=True, help='Scan only lines added in staged changes, as a pre-commit hook')
 def scan(
     path: Optional[str],
     stdin: bool,
@@ -36,6 +67,24 @@ def scan(
     mask: Optional[str],
     output: Optional[str],
     html: bool,
+    stream_threshold: int,
+    use_mmap: bool,
+    jobs: int,
+    unordered: bool,
+    use_cache: bool,
+    cache_dir: Optional[str],
+    resolve_overlaps: bool,
+    alternates: bool,
+    hardlink: bool,
+    hash_key: Optional[str],
+    hash_length: int,
+    hash_algorithm: Optional[str],
+    vault: Optional[str],
+    store: Optional[str],
+    git_diff: Optional[str],
+    staged: bool,
+    excludes: Tuple[str, ...],
+    gitignore: bool,
 ):
     """
     Scan files or directories for PII.
@@ -43,30 +92,83 @@ def scan(
     Examples:
       pii-guard scan input.txt
       pii-guard scan --format json ./logs/
+      pii-guard scan -j 8 ./repo/
+      pii-guard scan --mask full --output ./clean/ ./export/
+      pii-guard scan --store findings.db ./repo/
+      pii-guard scan --staged
+      pii-guard scan --git-diff origin/main...HEAD
       echo "test" | pii-guard scan --stdin --mask full
     """
-    scanner = Scanner(threshold=threshold)
+    scanner = Scanner(threshold=threshold, stream_threshold=stream_threshold * 1024 * 1024, use_mmap=use_mmap,
+                      resolve_overlaps=resolve_overlaps, keep_alternates=alternates,
+                      ignore_patterns=excludes, gitignore=gitignore)
+    # Match tables do not carry alternates
+    compact = not alternates
+    cache: Optional[ScanCache] = None
+
+    if store and mask:
+        click.echo("Error: --store records scan findings and cannot be combined with --mask", err=True)
+        sys.exit(1)
+    if (git_diff or staged) and (mask or stdin):
+        click.echo("Error: --git-diff and --staged cannot be combined with --mask or --stdin", err=True)
+        sys.exit(1)
+
+    masker = None
+    if mask:
+        try:
+            masker = Masker(strategy=MaskingStrategy(mask), hash_key=hash_key,
+                            hash_length=hash_length, hash_algorithm=hash_algorithm, vault=vault)
+        except ValueError as e:
+            click.echo(f"Error: {e}", err=True)
+            sys.exit(1)
+        if mask == 'hash' and hash_key is None:
+            click.echo("Warning: hashing without --hash-key; short values can be recovered by brute force",
+                       err=True)
+
+    if stdin and mask:
+        # Mask stdin line by line, flushing each line so pipelines see it right away
+        try:
+            for piece in scanner.mask_stream(_available_input(sys.stdin), masker):
+                sys.stdout.write(piece)
+                sys.stdout.flush()
+        finally:
+            masker.flush()
+        return
 
-    if stdin:
+    if git_diff or staged:
+        # Only added lines; PATH, if given, limits the scan to part of the repository
+        if path and not Path(path).exists():
+            click.echo(f"Error: Path not found: {path}", err=True)
+            sys.exit(1)
+        if not path:
+            repo, paths = '.', []
+        elif Path(path).is_file():
+            repo, paths = str(Path(path).parent), [Path(path).name]
+        else:
+            repo, paths = path, ['.']
+        try:
+            results = scan_changes(scanner, repo, ref=git_diff, staged=staged, paths=paths)
+        except ValueError as e:
+            click.echo(f"Error: {e}", err=True)
+            sys.exit(1)
+    elif stdin:
         # Read from stdin
         text = sys.stdin.read()
-        result = scanner.scan_text(text, "<stdin>")
+        result = scanner.scan_text(text, "<stdin>", compact=compact)
         results = [result]
-
-        if mask:
-            # Apply masking to stdin
-            masker = Masker(strategy=MaskingStrategy(mask))
-            masked_text = _apply_masking(text, result, masker)
-            click.echo(masked_text)
-            return
     elif path:
         # Scan file or directory
         p = Path(path)
-        if p.is_file():
-            result = scanner.scan_file(path)
+        if mask and output and (p.is_file() or p.is_dir()):
+            # Scanned and masked together below
+            results = []
+        elif p.is_file():
+            result = scanner.scan_file(path, compact=compact)
             results = [result]
         elif p.is_dir():
-            results = scanner.scan_directory(path)
+            # Results are formatted as the scan produces them; the cache is closed afterwards
+            cache = _open_cache(cache_dir) if use_cache else None
+            results = scanner.iter_directory(path, workers=jobs, ordered=not unordered, cache=cache)
         else:
             click.echo(f"Error: Path not found: {path}", err=True)
             sys.exit(1)
@@ -76,14 +178,13 @@ def scan(
 
     # Handle masking with output file
     if mask and output and not stdin:
-        masking_strategy = MaskingStrategy(mask)
-        masker = Masker(strategy=masking_strategy)
-
-        if len(results) == 1:
+        if Path(path).is_file():
             # Single file
             with open(path, 'r', encoding='utf-8') as f:
                 text = f.read()
-            masked_text = _apply_masking(text, results[0], masker)
+            masked_text, result = scanner.mask_text(text, masker, path)
+            results = [result]
+            masker.flush()
 
             with open(output, 'w', encoding='utf-8') as f:
                 f.write(masked_text)
@@ -101,33 +202,78 @@ def scan(
                     masked_val = masker.mask(match.value, match.type)
                     click.echo(f"  {match.type}: {masked_val}")
         else:
-            click.echo("Error: --output only supported for single files", err=True)
-            sys.exit(1)
+            try:
+                manifest = scanner.mask_directory(path, output, masker, workers=jobs, hardlink=hardlink)
+            except ValueError as e:
+                click.echo(f"Error: {e}", err=True)
+                sys.exit(1)
+            files = manifest["files"]
+
+            click.echo(f"Scanning: {path}")
+            click.echo(f"Masking mode: {mask}\n")
+            click.echo(f"Processed {sum(files.values())} files:")
+            click.echo(f"- Masked {sum(manifest['findings'].values())} PII instances in {files['masked']} files")
+            click.echo(f"- Copied {files['copied']} files without PII")
+            if files['skipped']:
+                click.echo(f"- Skipped {files['skipped']} binary or ignored files")
+            if files['failed']:
+                click.echo(f"- Failed on {files['failed']} files (see manifest)")
+            click.echo(f"- Output written to: {output}")
+            click.echo(f"- Manifest: {Path(output) / MANIFEST_NAME}")
+            if files['failed']:
+                sys.exit(1)
 
         return
 
+    findings_store: Optional[FindingsStore] = None
+    if store:
+        try:
+            findings_store = FindingsStore(store)
+        except (OSError, sqlite3.Error) as e:
+            _close(cache)
+            click.echo(f"Error: cannot open findings store: {e}", err=True)
+            sys.exit(1)
+        # Findings are recorded as the formatter consumes the results
+        # Without PATH, --git-diff and --staged scan the whole repository
+        if stdin:
+            root = "<stdin>"
+        else:
+            root = str(Path(path).resolve()) if path else toplevel('.')
+        scan_id = findings_store.begin_scan(root, scanner.fingerprint())
+        results = findings_store.record(scan_id, results)
+
     # HTML report mode
     if html:
         from pii_shield.report import export_html
         import webbrowser
-        report_path = export_html(results)
+        try:
+            report_path = export_html(results)
+            if findings_store is not None:
+                findings_store.finish_scan(scan_id)
+        finally:
+            _close(cache, findings_store)
         click.echo(f"Report saved: {report_path}")
         webbrowser.open(f"file://{report_path}")
         return
 
-    # Format output
+    # Format output, writing each finding as soon as it is available
     if format == 'json':
         formatter = JSONFormatter()
+    elif format == 'ndjson':
+        formatter = NDJSONFormatter()
     elif format == 'csv':
         formatter = CSVFormatter()
     else:
         formatter = TextFormatter()
 
-    output_text = formatter.format(results)
-    click.echo(output_text)
+    try:
+        total_matches = formatter.write(results, sys.stdout)
+        if findings_store is not None:
+            findings_store.finish_scan(scan_id)
+    finally:
+        _close(cache, findings_store)
 
     # Exit with error if PII found
-    total_matches = sum(len(r.matches) for r in results)
     if total_matches > 0:
         sys.exit(1)
 
@@ -172,6 +318,156 @@ def patterns(list_patterns: bool, show: Optional[str]):
         click.echo("Use --list to show all patterns or --show TYPE for details")
 
 
+@cli.command()
+@click.option('--size', type=float, default=1.0, help='MB of text per corpus')
+@click.option('--corpus', 'corpora', multiple=True, type=click.Choice(CORPORA), help='Corpus to run (repeatable; default: all)')
+@click.option('--repeat', type=int, default=3, help='Runs per measurement; the fastest is kept')
+@click.option('--seed', type=int, default=0, help='Corpus seed')
+@click.option('--output', '-o', type=click.Path(), help='Write results as JSON')
+@click.option('--baseline', type=click.Path(exists=True, dir_okay=False), help='Compare against stored results')
+@click.option('--tolerance', type=float, default=DEFAULT_TOLERANCE, help='Allowed relative slowdown before failing')
+def bench(
+    size: float,
+    corpora: Tuple[str, ...],
+    repeat: int,
+    seed: int,
+    output: Optional[str],
+    baseline: Optional[str],
+    tolerance: float,
+):
+    """
+    Benchmark scanning throughput on synthetic corpora.
+
+    Examples:
+      pii-guard bench -o baseline.json
+      pii-guard bench --baseline baseline.json
+      pii-guard bench --corpus logs --corpus csv --size 8
+    """
+    results = run_benchmark(size=int(size * 1024 * 1024), corpora=corpora, seed=seed, repeat=repeat)
+    click.echo(format_results(results))
+
+    if output:
+        save_results(results, output)
+        click.echo(f"\nResults written to: {output}")
+
+    if baseline:
+        problems = compare(results, load_results(baseline), tolerance)
+        if problems:
+            click.echo("\nRegressions against baseline:", err=True)
+            for problem in problems:
+                click.echo(f"  {problem}", err=True)
+            sys.exit(1)
+        click.echo(f"\nNo regressions against {baseline}")
+
+
+@cli.command()
+@click.argument('path', required=False, type=click.Path(exists=True, dir_okay=False))
+@click.option('--vault', required=True, type=click.Path(exists=True, dir_okay=False), help='Token vault used when masking')
+@click.option('--output', '-o', type=click.Path(), help='Write the restored text here instead of stdout')
+def detokenize(path: Optional[str], vault: str, output: Optional[str]):
+    """
+    Restore values masked with --mask token.
+
+    Examples:
+      pii-guard detokenize --vault tokens.db masked.txt
+      cat masked.log | pii-guard detokenize --vault tokens.db
+    """
+    source = open(path, 'r', encoding='utf-8', errors='surrogateescape', newline='') if path else sys.stdin
+    target = open(output, 'w', encoding='utf-8', errors='surrogateescape', newline='') if output else sys.stdout
+    try:
+        with TokenVault(vault) as token_vault:
+            # Tokens never span lines, so whole lines can be restored a batch at a time
+            for lines in iter(lambda: source.readlines(DETOKENIZE_BATCH), []):
+                target.write(token_vault.detokenize(''.join(lines)))
+    finally:
+        if path:
+            source.close()
+        if output:
+            target.close()
+
+
+@cli.command()
+@click.argument('store', type=click.Path(exists=True, dir_okay=False))
+@click.option('--value', help='Find where this exact value was found')
+@click.option('--type', 'pii_type', help='Only findings of this PII type')
+@click.option('--file', 'file_glob', help='Only files matching this glob pattern')
+@click.option('--scan', 'scan_id', type=int, help='Only findings of this scan (default: all scans)')
+@click.option('--latest', is_flag=True, help='Only findings of the most recent scan')
+@click.option('--scans', 'list_scans', is_flag=True, help='List the recorded scans')
+@click.option('--top', type=int, default=10, help='Files listed in the summary')
+@click.option('--limit', type=int, help='Maximum number of findings listed')
+@click.option('--format', '-f', type=click.Choice(['text', 'json']), default='text', help='Output format')
+def query(
+    store: str,
+    value: Optional[str],
+    pii_type: Optional[str],
+    file_glob: Optional[str],
+    scan_id: Optional[int],
+    latest: bool,
+    list_scans: bool,
+    top: int,
+    limit: Optional[int],
+    format: str,
+):
+    """
+    Query findings recorded with scan --store, without rescanning.
+
+    Without --value or --file, prints finding counts per type and the files
+    with the most findings. With them, lists the matching findings.
+
+    Examples:
+      pii-guard query findings.db
+      pii-guard query findings.db --latest --type SSN
+      pii-guard query findings.db --value alice@company.com
+      pii-guard query findings.db --file '*/config/*' --format json
+    """
+    with FindingsStore(store) as findings_store:
+        if list_scans:
+            scans = findings_store.scans()
+            if format == 'json':
+                click.echo(json.dumps(scans, indent=2))
+                return
+            for s in scans:
+                started = datetime.fromtimestamp(s['started']).isoformat(sep=' ', timespec='seconds')
+                state = "" if s['finished'] else " (unfinished)"
+                click.echo(f"#{s['id']}  {started}  {s['findings']} findings  {s['root']}{state}")
+            return
+
+        if latest:
+            scan_id = findings_store.latest_scan()
+
+        if value is None and file_glob is None:
+            summary = findings_store.summary(scan_id, pii_type=pii_type)
+            files = findings_store.top_files(top, scan_id, pii_type=pii_type)
+            if format == 'json':
+                click.echo(json.dumps({
+                    "total_findings": sum(summary.values()),
+                    "summary": summary,
+                    "top_files": [{"file": f, "findings": n} for f, n in files]
+                }, indent=2))
+                return
+            click.echo(f"Findings: {sum(summary.values())}")
+            for name, count in summary.items():
+                click.echo(f"  {name}: {count}")
+            if files:
+                click.echo("\nTop files:")
+                for f, n in files:
+                    click.echo(f"  {n:>8}  {f}")
+            return
+
+        findings = findings_store.find(value=value, pii_type=pii_type, file=file_glob,
+                                       scan_id=scan_id, limit=limit)
+        if format == 'json':
+            click.echo(json.dumps(list(findings), indent=2))
+            return
+        count = 0
+        for finding in findings:
+            count += 1
+            click.echo(f"#{finding['scan']}  {finding['file']}:{finding['line']}:{finding['column']}  "
+                       f"{finding['type']} (confidence: {finding['confidence']})")
+        click.echo(f"{count} finding(s)")
+
+
 @cli.command()
 def config():
     """Show current configuration."""
@@ -179,28 +475,47 @@ def config():
     click.echo(f"  Version: {__version__}")
     click.echo(f"  Default threshold: 70")
     click.echo(f"  Supported patterns: {len(PATTERNS)}")
-    click.echo(f"  Output formats: text, json, csv")
+    click.echo(f"  Output formats: text, json, ndjson, csv")
     click.echo(f"  Masking strategies: full, partial, hash, token")
 
 
-def _apply_masking(text: str, result, masker: Masker) -> str:
-    """Apply masking to text based on scan result."""
-    # Sort matches by position (reverse order to maintain positions)
-    sorted_matches = sorted(result.matches, key=lambda m: (m.line, m.column), reverse=True)
+class _AvailableReader:
+    """Text reader over a binary stream that returns whatever input has arrived."""
+
+    def __init__(self, buffer, encoding: str, errors: str):
+        self.buffer = buffer
+        self.decoder = codecs.getincrementaldecoder(encoding)(errors)
+
+    def read(self, size: int = -1) -> str:
+        while True:
+            data = self.buffer.read1(size)
+            text = self.decoder.decode(data, final=not data)
+            if text or not data:
+                return text
+
+
+def _available_input(stream: IO[str]):
+    """Return a reader for a text stream that does not wait to fill each read."""
+    buffer = getattr(stream, 'buffer', None)
+    if buffer is None or not hasattr(buffer, 'read1'):
+        return stream
+    return _AvailableReader(buffer, stream.encoding or 'utf-8', stream.errors or 'strict')
 
-    lines = text.split('\n')
 
-    for match in sorted_matches:
-        if match.line <= len(lines):
-            line = lines[match.line - 1]
-            masked_value = masker.mask(match.value, match.type)
+def _close(*databases) -> None:
+    """Close the scan cache and findings store, whichever are open."""
+    for database in databases:
+        if database is not None:
+            database.close()
 
-            # Find and replace the value in the line
-            if match.value in line:
-                line = line.replace(match.value, masked_value, 1)
-                lines[match.line - 1] = line
 
-    return '\n'.join(lines)
+def _open_cache(cache_dir: Optional[str]) -> Optional[ScanCache]:
+    """Open the scan cache, or return None if it cannot be used."""
+    try:
+        return ScanCache(cache_dir)
+    except (OSError, sqlite3.Error) as e:
+        click.echo(f"Warning: scan cache disabled: {e}", err=True)
+        return None
 
 
 def main():
@@ -1,6 +1,20 @@
 """Context analysis for PII detection."""
 
 import re
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+# Label just before a match, e.g. "SSN: 123-45-6789"
+_LABEL_BEFORE = re.compile(r'[:=]\s*$')
+_LABELS = re.compile(r'[:=]')
+# Characters that suggest an identifier or code rather than a value
+_SEPARATORS = re.compile(r'[_\-\.]')
+# Characters before a match checked for separators
+_SEPARATOR_REACH = 5
+# ContextIndex builds its index once lookups average one per this many characters...
+INDEX_SPACING = 64
+# ...over at least this many lookups
+INDEX_MIN_LOOKUPS = 16
 
 
 class ContextAnalyzer:
@@ -14,9 +28,24 @@ class ContextAnalyzer:
         "API_KEY": ["key", "token", "secret", "api"],
     }
 
-    def analyze_context(self, text: str, match_start: int, match_end: int, pii_type: str) -> int:
-        """Analyze context and return confidence adjustment (-20 to +20)."""
-        window_size = 50
+    # Characters on each side of a match searched for keywords and labels
+    WINDOW_SIZE = 50
+
+    def index(self, text: str) -> "ContextIndex":
+        """Return a ContextIndex for scoring many matches in one text."""
+        return ContextIndex(self, text)
+
+    def analyze_context(self, text: str, match_start: int, match_end: int, pii_type: str,
+                        index: Optional["ContextIndex"] = None) -> int:
+        """Analyze context and return confidence adjustment (-20 to +20).
+
+        If ``index`` is given it must have been built for ``text``; the
+        adjustment is then looked up instead of computed from the window.
+        """
+        if index is not None:
+            return index.adjustment(match_start, match_end, pii_type)
+
+        window_size = self.WINDOW_SIZE
         context_start = max(0, match_start - window_size)
         context_end = min(len(text), match_end + window_size)
         context = text[context_start:context_end].lower()
@@ -34,11 +63,103 @@ class ContextAnalyzer:
 
         # Check for labeling patterns (e.g., "SSN: 123-45-6789")
         before_context = text[context_start:match_start]
-        if re.search(r'[:=]\s*$', before_context):
+        if _LABEL_BEFORE.search(before_context):
             adjustment += 15
 
         # Penalize if in code-like context
-        if re.search(r'[_\-\.]', before_context[-5:]):
+        if _SEPARATORS.search(before_context[-_SEPARATOR_REACH:]):
+            adjustment -= 10
+
+        return max(-20, min(20, adjustment))
+
+
+class ContextIndex:
+    """Keyword and label positions in one text.
+
+    Once built, a ContextAnalyzer adjustment is a few bisects into sorted
+    offset lists instead of slicing and lowercasing a window per match.
+    Building takes one pass per keyword over the lowercased text, which
+    only pays off when matches are dense, so lookups are answered from
+    their windows until at least INDEX_MIN_LOOKUPS of them have come at an
+    average of one per INDEX_SPACING characters or closer. Scores are
+    identical either way.
+
+    If lowercasing changes the length of the text (e.g. for 'İ'), offsets
+    in the lowercased copy no longer line up with the original, and the
+    index is never built.
+    """
+
+    def __init__(self, analyzer: ContextAnalyzer, text: str):
+        self.analyzer = analyzer
+        self.text = text
+        self.window_size = analyzer.WINDOW_SIZE
+        self._lookups = 0
+        self._built = False
+        # Per keyword group: sorted keyword starts, and the smallest end
+        # offset of any keyword starting at or after each of them
+        self._keywords: Dict[str, Tuple[List[int], List[int]]] = {}
+        self._labels: List[int] = []
+        # Keyword groups consulted for each PII type, in scoring order
+        self._groups: Dict[str, List[Tuple[List[int], List[int]]]] = {}
+
+    def _build(self) -> bool:
+        """Find every keyword and label in the text; False if offsets would not line up."""
+        text = self.text
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # Never worth retrying for this text
+            self._lookups = -len(text)
+            return False
+        for key_type, keywords in self.analyzer.CONTEXT_KEYWORDS.items():
+            spans = []
+            for keyword in keywords:
+                pos = lowered.find(keyword)
+                while pos != -1:
+                    spans.append((pos, pos + len(keyword)))
+                    pos = lowered.find(keyword, pos + 1)
+            spans.sort()
+            min_ends = [end for _, end in spans]
+            for i in range(len(min_ends) - 2, -1, -1):
+                if min_ends[i + 1] < min_ends[i]:
+                    min_ends[i] = min_ends[i + 1]
+            self._keywords[key_type] = ([start for start, _ in spans], min_ends)
+        self._labels = [m.start() for m in _LABELS.finditer(text)]
+        self._built = True
+        return True
+
+    def adjustment(self, match_start: int, match_end: int, pii_type: str) -> int:
+        """Return the ContextAnalyzer adjustment for a match in the text."""
+        if not self._built:
+            self._lookups += 1
+            dense = self._lookups >= INDEX_MIN_LOOKUPS and self._lookups * INDEX_SPACING >= match_start
+            if not (dense and self._build()):
+                return self.analyzer.analyze_context(self.text, match_start, match_end, pii_type)
+
+        text = self.text
+        context_start = max(0, match_start - self.window_size)
+        context_end = min(len(text), match_end + self.window_size)
+
+        adjustment = 0
+
+        groups = self._groups.get(pii_type)
+        if groups is None:
+            base_type = pii_type.split('_')[0]
+            groups = self._groups[pii_type] = [self._keywords[t] for t in (pii_type, base_type)
+                                               if t in self._keywords]
+        for starts, min_ends in groups:
+            i = bisect_left(starts, context_start)
+            if i < len(starts) and min_ends[i] <= context_end:
+                adjustment += 10
+
+        # A label counts if only whitespace separates it from the match
+        labels = self._labels
+        i = bisect_left(labels, match_start) - 1
+        if i >= 0 and labels[i] >= context_start:
+            between = text[labels[i] + 1:match_start]
+            if not between or between.isspace():
+                adjustment += 15
+
+        if _SEPARATORS.search(text, max(context_start, match_start - _SEPARATOR_REACH), match_start):
             adjustment -= 10
 
         return max(-20, min(20, adjustment))
@@ -0,0 +1,252 @@
+"""Single-pass multi-pattern matching engine."""
+
+import re
+from typing import Dict, FrozenSet, Iterator, List, Optional, Sequence, Tuple, Union
+
+from pii_shield.patterns import PATTERNS, PATTERN_ANCHORS, PatternAnchor
+
+# Pattern flags that can be expressed as scoped inline flags, e.g. (?i:...)
+_INLINE_FLAGS = ((re.IGNORECASE, 'i'), (re.MULTILINE, 'm'), (re.DOTALL, 's'), (re.VERBOSE, 'x'))
+# Candidate lines are merged into regions of at most this many characters...
+REGION_SIZE = 8192
+# ...when no more than this many characters separate them
+REGION_GAP = 512
+# Master regexes kept for distinct sets of active pattern types
+_MAX_MASTERS = 256
+
+
+class PatternEngine:
+    """Runs every enabled pattern in one regex pass over the text.
+
+    The master regex starts with a lookahead alternation of all patterns,
+    which locates candidate positions in C; the leading ``\\b`` shared by
+    most patterns is hoisted out of the alternation so that positions
+    inside a word are rejected with a single check. It is followed by one
+    optional lookahead with a named group per type, so every type that
+    matches at a candidate position is reported, not just the first
+    alternative. Per-type ``finditer`` semantics are replayed afterwards,
+    which keeps the findings identical to running each pattern line by line.
+
+    When every pattern has an anchor (see ``PATTERN_ANCHORS``), a gate regex
+    made of the anchors alone first finds the lines that could match
+    anything. Only those lines are searched, and only with a master built
+    for the types whose anchors they contain, so text without PII costs a
+    single cheap scan.
+
+    With ``binary=True`` the patterns are compiled as bytes regexes, so the
+    engine can search bytes, bytearrays and mmaps without decoding them.
+    Character classes such as ``\\d`` and ``\\b`` then only consider ASCII.
+    """
+
+    def __init__(self, patterns: Optional[Dict[str, Tuple[re.Pattern, int, str]]] = None,
+                 binary: bool = False, anchors: Optional[Dict[str, PatternAnchor]] = None):
+        if patterns is None:
+            patterns = PATTERNS
+        if anchors is None:
+            anchors = PATTERN_ANCHORS
+        self.types = list(patterns)
+        self.binary = binary
+        self._newline = b'\n' if binary else '\n'
+        self.compiled = [patterns[t][0] for t in self.types]
+        if binary:
+            self.compiled = [re.compile(p.pattern.encode('ascii'), p.flags & ~re.UNICODE)
+                             for p in self.compiled]
+
+        self._masters: Dict[FrozenSet[int], Tuple[re.Pattern, List[int]]] = {}
+        self.master: Optional[re.Pattern] = None
+        self._group_index: List[int] = []
+        if self.types:
+            self.master, self._group_index = self._compile_master(range(len(self.types)))
+
+        self.gate: Optional[re.Pattern] = None
+        self._checks: List[re.Pattern] = []
+        self._type_checks: List[List[int]] = []
+        if self.types and all(t in anchors for t in self.types):
+            self._compile_anchors([anchors[t] for t in self.types])
+
+    def _compile(self, source: str) -> re.Pattern:
+        """Compile generated regex source for this engine's text type."""
+        return re.compile(source.encode('ascii') if self.binary else source)
+
+    @staticmethod
+    def _source(pattern: re.Pattern) -> str:
+        """Return the pattern source as text."""
+        if isinstance(pattern.pattern, bytes):
+            return pattern.pattern.decode('ascii')
+        return pattern.pattern
+
+    @classmethod
+    def _inline(cls, pattern: re.Pattern, source: Optional[str] = None) -> str:
+        """Return the pattern source (or part of it) with its flags scoped to it."""
+        if source is None:
+            source = cls._source(pattern)
+        flags = ''.join(letter for flag, letter in _INLINE_FLAGS if pattern.flags & flag)
+        if flags:
+            return f'(?{flags}:{source})'
+        return f'(?:{source})'
+
+    def _compile_master(self, indices: Sequence[int]) -> Tuple[re.Pattern, List[int]]:
+        """Build the master regex for a subset of the pattern types."""
+        compiled = [self.compiled[i] for i in indices]
+        bounded = [self._inline(p, self._source(p)[2:]) for p in compiled
+                   if self._source(p).startswith(r'\b')]
+        unbounded = [self._inline(p) for p in compiled if not self._source(p).startswith(r'\b')]
+        alternatives = unbounded
+        if bounded:
+            alternatives = [r'\b(?:' + '|'.join(bounded) + ')'] + unbounded
+        prefilter = '(?=' + '|'.join(alternatives) + ')'
+        groups = ''.join(f'(?=(?P<_p{i}>{self._inline(p)}))?' for i, p in zip(indices, compiled))
+        master = self._compile(prefilter + groups)
+        return master, [master.groupindex[f'_p{i}'] for i in indices]
+
+    def _master_for(self, indices: Tuple[int, ...]) -> Tuple[re.Pattern, List[int]]:
+        """Return the (cached) master regex for a subset of the pattern types."""
+        key = frozenset(indices)
+        if key not in self._masters:
+            if len(self._masters) >= _MAX_MASTERS:
+                self._masters.clear()
+            self._masters[key] = self._compile_master(indices)
+        return self._masters[key]
+
+    @staticmethod
+    def _literal_source(literal: str, ignore_case: bool) -> str:
+        """Regex source for a literal, spelling out case variants as classes."""
+        if not ignore_case:
+            return re.escape(literal)
+        return ''.join(f'[{c.lower()}{c.upper()}]' if c.isalpha() else re.escape(c) for c in literal)
+
+    @staticmethod
+    def _digits_source(count: int) -> str:
+        """Regex source for a run of digits, starting with a plain class."""
+        return r'\d' + (fr'\d{{{count - 1}}}' if count > 1 else '')
+
+    def _compile_anchors(self, anchors: List[PatternAnchor]) -> None:
+        """Build the gate regex and the per-type anchor checks."""
+        checks: Dict[str, int] = {}
+        gate_literals = set()
+        gate_digits = []
+
+        for anchor in anchors:
+            sources = []
+            literal_source = None
+            if anchor.literals:
+                literal_source = '|'.join(self._literal_source(lit, anchor.ignore_case)
+                                          for lit in anchor.literals)
+                sources.append(literal_source)
+            if anchor.min_digits:
+                sources.append(self._digits_source(anchor.min_digits))
+            self._type_checks.append([checks.setdefault(src, len(checks)) for src in sources])
+
+            # Gate on the more selective condition: a digit run beats a single character
+            single_chars = all(len(lit) == 1 for lit in anchor.literals)
+            if anchor.literals and not (anchor.min_digits and single_chars):
+                gate_literals.add(literal_source)
+            else:
+                gate_digits.append(anchor.min_digits)
+
+        self._checks = [self._compile(src) for src in checks]
+        alternatives = sorted(gate_literals)
+        if gate_digits:
+            alternatives.append(self._digits_source(min(gate_digits)))
+        self.gate = self._compile('|'.join(alternatives))
+
+    def finditer(self, text: Union[str, bytes], pos: int = 0, endpos: Optional[int] = None,
+                 skip_until: Optional[Dict[str, int]] = None) -> Iterator[Tuple[str, int, int]]:
+        """
+        Yield ``(pii_type, start, end)`` for every pattern hit in the text.
+
+        Hits are yielded in order of start offset, then in pattern order.
+        Matches never span a newline, as if each line were scanned on its own.
+
+        Args:
+            text: Text to search
+            pos: Offset to start searching at
+            endpos: Offset to stop searching at
+            skip_until: Per-type offsets before which no hit may start, used
+                to resume a scan after a match that ran past ``pos``
+        """
+        if self.master is None:
+            return
+        if endpos is None:
+            endpos = len(text)
+
+        last_end = [-1] * len(self.types)
+        if skip_until:
+            last_end = [skip_until.get(t, -1) for t in self.types]
+
+        if self.gate is None:
+            yield from self._search(self.master, self._group_index, range(len(self.types)),
+                                    text, pos, endpos, last_end)
+            return
+
+        for start, end in self._regions(text, pos, endpos):
+            active = self._active_types(text, start, end)
+            if active:
+                master, group_index = self._master_for(active)
+                yield from self._search(master, group_index, active, text, start, end, last_end)
+
+    def _regions(self, text: Union[str, bytes], pos: int, endpos: int) -> Iterator[Tuple[int, int]]:
+        """Yield spans of whole lines containing a gate hit, merging nearby lines."""
+        newline = self._newline
+        search = self.gate.search
+        region_start = region_end = -1
+
+        hit = search(text, pos, endpos)
+        while hit is not None:
+            lower = max(pos, region_end)
+            previous = text.rfind(newline, lower, hit.start())
+            line_start = previous + 1 if previous != -1 else lower
+            line_end = text.find(newline, hit.start(), endpos)
+            if line_end == -1:
+                line_end = endpos
+
+            if (region_start >= 0 and line_start - region_end <= REGION_GAP
+                    and line_end - region_start <= REGION_SIZE):
+                region_end = line_end
+            else:
+                if region_start >= 0:
+                    yield region_start, region_end
+                region_start, region_end = line_start, line_end
+            hit = search(text, line_end, endpos)
+
+        if region_start >= 0:
+            yield region_start, region_end
+
+    def _active_types(self, text: Union[str, bytes], start: int, end: int) -> Tuple[int, ...]:
+        """Return the indices of the types whose anchors all occur in a span."""
+        results: Dict[int, bool] = {}
+        active = []
+        for i, type_checks in enumerate(self._type_checks):
+            for check in type_checks:
+                found = results.get(check)
+                if found is None:
+                    found = results[check] = self._checks[check].search(text, start, end) is not None
+                if not found:
+                    break
+            else:
+                active.append(i)
+        return tuple(active)
+
+    def _search(self, master: re.Pattern, group_index: List[int], indices: Sequence[int],
+                text: Union[str, bytes], pos: int, endpos: int,
+                last_end: List[int]) -> Iterator[Tuple[str, int, int]]:
+        """Run a master regex over a span and replay per-type finditer semantics."""
+        types = self.types
+        newline = self._newline
+        compiled = self.compiled
+
+        for m in master.finditer(text, pos, endpos):
+            regs = m.regs
+            for i, gi in zip(indices, group_index):
+                start, end = regs[gi]
+                if start < 0 or start < last_end[i]:
+                    continue
+                if text.find(newline, start, end) != -1:
+                    # Re-match against the line alone so the hit stays on it
+                    line_end = text.find(newline, start)
+                    line_match = compiled[i].match(text, start, line_end)
+                    if line_match is None:
+                        continue
+                    end = line_match.end()
+                last_end[i] = end
+                yield types[i], start, end
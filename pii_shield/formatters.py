@@ -1,75 +1,176 @@
 """Output formatters for scan results."""
 
+import abc
+import csv
+import io
 import json
-from typing import List
-from pii_shield.models import ScanResult
+from typing import IO, Any, Dict, Iterable, List
+from pii_shield.models import PIIMatch, ScanResult
 
 
-class TextFormatter:
-    """Format results as human-readable text."""
+class Formatter(abc.ABC):
+    """
+    Base for formatters that write results as they are produced.
+
+    ``write`` consumes an iterable of results, so the output of a directory
+    scan can start before the scan has finished, and nothing but the
+    current result and the per-type counts is held in memory.
+    """
+
+    @abc.abstractmethod
+    def write(self, results: Iterable[ScanResult], out: IO[str]) -> int:
+        """
+        Write scan results to a text stream, ending with a line break.
+
+        Args:
+            results: Results to write, consumed once
+            out: Stream to write to
+
+        Returns:
+            Total number of findings written
+        """
 
     def format(self, results: List[ScanResult]) -> str:
-        """Format scan results as text."""
-        output = []
+        """Format scan results as one string, without the final line break."""
+        buffer = io.StringIO()
+        self.write(results, buffer)
+        text = buffer.getvalue()
+        return text[:-1] if text.endswith('\n') else text
+
+
+def _finding(file: str, match: PIIMatch) -> Dict[str, Any]:
+    """Return the JSON record of a finding."""
+    finding = {
+        "file": file,
+        "line": match.line,
+        "column": match.column,
+        "type": match.type,
+        "value": match.value,
+        "confidence": match.confidence,
+        "context": match.context
+    }
+    if match.alternates:
+        finding["alternates"] = [
+            {"type": alt.type, "value": alt.value, "confidence": alt.confidence}
+            for alt in match.alternates
+        ]
+    return finding
+
+
+def _indented(finding: Dict[str, Any]) -> str:
+    """Lay out a finding as json.dumps(indent=2) does inside the findings list.
+
+    Scalars go through the C encoder, which json.dumps skips when indenting.
+    """
+    fields = []
+    for key, value in finding.items():
+        encoded = json.dumps(value, indent=2) if isinstance(value, list) else json.dumps(value)
+        fields.append(f'      "{key}": ' + encoded.replace('\n', '\n      '))
+    return '    {\n' + ',\n'.join(fields) + '\n    }'
+
+
+class TextFormatter(Formatter):
+    """Format results as human-readable text."""
+
+    def write(self, results: Iterable[ScanResult], out: IO[str]) -> int:
+        """Write scan results as text."""
+        total_matches = 0
+        total_files = 0
 
         for result in results:
             if result.matches:
-                output.append(f"Scanning: {result.file}\n")
+                total_files += 1
+                out.write(f"Scanning: {result.file}\n\n")
                 for match in result.matches:
-                    output.append(f"[Line {match.line}] {match.type} (confidence: {match.confidence})")
-                    output.append(f"  {match.value}")
-                    output.append(f'  Context: "{match.context}"\n')
+                    total_matches += 1
+                    out.write(f"[Line {match.line}] {match.type} (confidence: {match.confidence})\n")
+                    out.write(f"  {match.value}\n")
+                    out.write(f'  Context: "{match.context}"\n\n')
 
-        total_matches = sum(len(r.matches) for r in results)
-        total_files = len([r for r in results if r.matches])
-        output.append(f"Summary: {total_matches} PII instances found in {total_files} file(s)")
+        out.write(f"Summary: {total_matches} PII instances found in {total_files} file(s)\n")
+        return total_matches
 
-        return '\n'.join(output)
 
+class JSONFormatter(Formatter):
+    """
+    Format results as one JSON document.
 
-class JSONFormatter:
-    """Format results as JSON."""
+    Findings are written as they are produced; the file count, finding
+    count and per-type summary follow them.
+    """
 
-    def format(self, results: List[ScanResult]) -> str:
-        """Format scan results as JSON."""
-        findings = []
-        summary = {}
+    def write(self, results: Iterable[ScanResult], out: IO[str]) -> int:
+        """Write scan results as JSON."""
+        files_scanned = 0
+        total = 0
+        summary: Dict[str, int] = {}
 
+        out.write('{\n  "findings": [')
         for result in results:
+            files_scanned += 1
             for match in result.matches:
-                findings.append({
-                    "file": result.file,
-                    "line": match.line,
-                    "column": match.column,
-                    "type": match.type,
-                    "value": match.value,
-                    "confidence": match.confidence,
-                    "context": match.context
-                })
+                out.write(',\n' if total else '\n')
+                out.write(_indented(_finding(result.file, match)))
+                total += 1
                 summary[match.type] = summary.get(match.type, 0) + 1
+        out.write('\n  ],\n' if total else '],\n')
 
-        return json.dumps({
-            "files_scanned": len(results),
-            "total_findings": len(findings),
-            "findings": findings,
+        tail = json.dumps({
+            "files_scanned": files_scanned,
+            "total_findings": total,
             "summary": summary
         }, indent=2)
+        # Continue the object opened above, dropping the tail's own "{\n"
+        out.write(tail[2:])
+        out.write('\n')
+        return total
+
+
+class NDJSONFormatter(Formatter):
+    """
+    Format results as newline-delimited JSON.
 
+    Each finding is one line, written as soon as it is produced. The last
+    line is a summary record with ``files_scanned``, ``total_findings`` and
+    the per-type ``summary``; unlike findings it has no ``file`` key.
+    """
 
-class CSVFormatter:
+    def write(self, results: Iterable[ScanResult], out: IO[str]) -> int:
+        """Write scan results as NDJSON."""
+        files_scanned = 0
+        total = 0
+        summary: Dict[str, int] = {}
+
+        for result in results:
+            files_scanned += 1
+            for match in result.matches:
+                out.write(json.dumps(_finding(result.file, match), separators=(',', ':')))
+                out.write('\n')
+                total += 1
+                summary[match.type] = summary.get(match.type, 0) + 1
+
+        out.write(json.dumps({
+            "files_scanned": files_scanned,
+            "total_findings": total,
+            "summary": summary
+        }, separators=(',', ':')))
+        out.write('\n')
+        return total
+
+
+class CSVFormatter(Formatter):
     """Format results as CSV."""
 
-    def format(self, results: List[ScanResult]) -> str:
-        """Format scan results as CSV."""
-        output = ["file,line,column,type,confidence,value,context"]
+    def write(self, results: Iterable[ScanResult], out: IO[str]) -> int:
+        """Write scan results as CSV."""
+        writer = csv.writer(out, lineterminator='\n')
+        writer.writerow(["file", "line", "column", "type", "confidence", "value", "context"])
+        total = 0
 
         for result in results:
             for match in result.matches:
-                value = match.value.replace('"', '""')
-                context = match.context.replace('"', '""')
-                output.append(
-                    f'"{result.file}",{match.line},{match.column},'
-                    f'{match.type},{match.confidence},"{value}","{context}"'
-                )
-
-        return '\n'.join(output)
+                writer.writerow([result.file, match.line, match.column, match.type,
+                                 match.confidence, match.value, match.context])
+                total += 1
+
+        return total
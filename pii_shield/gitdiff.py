@@ -0,0 +1,187 @@
+"""Scanning of the lines changed in a git repository."""
+
+import codecs
+import os
+import re
+import subprocess
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from pii_shield.models import ScanResult
+
+# Hunk header of a unified diff: old line count, new first line and new line count
+_HUNK = re.compile(rb'^@@ -\d+(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
+
+
+def _git(repo: str, *args: str) -> bytes:
+    """Run a git command in a repository and return its output."""
+    try:
+        proc = subprocess.run(["git", "-C", repo, *args], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except OSError as e:
+        raise ValueError(f"Cannot run git: {e}")
+    if proc.returncode != 0:
+        raise ValueError(proc.stderr.decode('utf-8', 'replace').strip() or f"git {args[0]} failed")
+    return proc.stdout
+
+
+def toplevel(repo: str) -> str:
+    """Return the top-level directory of the repository containing a directory."""
+    return os.fsdecode(_git(repo, "rev-parse", "--show-toplevel").rstrip(b'\n'))
+
+
+def _unquote(path: bytes) -> bytes:
+    """Undo git's C-style quoting of unusual path names."""
+    if path.startswith(b'"') and path.endswith(b'"'):
+        return codecs.escape_decode(path[1:-1])[0]
+    return path
+
+
+def added_lines(repo: str, ref: Optional[str] = None, staged: bool = False,
+                paths: Sequence[str] = ()) -> Dict[str, List[Tuple[int, int]]]:
+    """
+    Return the line ranges each changed file gained, from one ``git diff``.
+
+    Args:
+        repo: Directory inside the repository
+        ref: Revision (or ``A..B`` range) to diff against; the index if None
+        staged: Diff the index against ``ref`` (default HEAD) instead of the working tree
+        paths: Limit the diff to these paths
+
+    Returns:
+        Map from repository-relative path to inclusive (first, last) line
+        ranges, in diff order. Deleted and binary files are left out.
+    """
+    args = ["-c", "core.quotepath=off", "diff", "-U0", "--no-color", "--no-ext-diff", "--no-textconv",
+            "--src-prefix=a/", "--dst-prefix=b/"]
+    if staged:
+        args.append("--cached")
+    if ref:
+        args.append(ref)
+    args.append("--")
+    args.extend(paths)
+
+    changes: Dict[str, List[Tuple[int, int]]] = {}
+    ranges: Optional[List[Tuple[int, int]]] = None
+    # Lines of the current hunk still to come, which may look like headers
+    pending = 0
+    for line in _git(repo, *args).split(b'\n'):
+        if pending:
+            if not line.startswith(b'\\'):
+                pending -= 1
+        elif line.startswith(b'diff --git'):
+            ranges = None
+        elif line.startswith(b'+++ '):
+            # git ends unquoted names containing a space with a TAB
+            name = _unquote(line[4:].rstrip(b'\t'))
+            # Otherwise /dev/null: the file was deleted
+            ranges = changes.setdefault(os.fsdecode(name[2:]), []) if name.startswith(b'b/') else None
+        elif line.startswith(b'@@'):
+            hunk = _HUNK.match(line)
+            if hunk:
+                removed = int(hunk.group(1)) if hunk.group(1) is not None else 1
+                first = int(hunk.group(2))
+                count = int(hunk.group(3)) if hunk.group(3) is not None else 1
+                pending = removed + count
+                if count and ranges is not None:
+                    ranges.append((first, first + count - 1))
+    return {path: lines for path, lines in changes.items() if lines}
+
+
+class BlobReader:
+    """
+    Reads objects through one long-lived ``git cat-file --batch`` process.
+
+    Objects are named as git revisions, e.g. ``:path`` for a staged file or
+    ``HEAD:path`` for a committed one.
+    """
+
+    def __init__(self, repo: str):
+        try:
+            self._proc = subprocess.Popen(["git", "-C", repo, "cat-file", "--batch"],
+                                          stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        except OSError as e:
+            raise ValueError(f"Cannot run git: {e}")
+
+    def __enter__(self) -> "BlobReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def read(self, name: str) -> Optional[bytes]:
+        """Return the contents of an object, or None if it does not exist or is not a blob."""
+        if '\n' in name:
+            return None
+        self._proc.stdin.write(os.fsencode(name) + b'\n')
+        self._proc.stdin.flush()
+        header = self._proc.stdout.readline().split()
+        if len(header) != 3 or not header[2].isdigit():
+            # "<name> missing" or "<name> ambiguous", whatever spaces the name holds
+            return None
+        data = self._proc.stdout.read(int(header[2]) + 1)[:-1]
+        return data if header[1] == b'blob' else None
+
+    def close(self) -> None:
+        """Stop the cat-file process."""
+        self._proc.stdin.close()
+        self._proc.wait()
+        self._proc.stdout.close()
+
+
+def scan_changes(scanner, repo: str, ref: Optional[str] = None, staged: bool = False,
+                 paths: Sequence[str] = ()) -> Iterator[ScanResult]:
+    """
+    Scan only the lines added in a repository, as ``scanner.scan_lines`` does.
+
+    With ``staged``, the staged contents are scanned. With a range
+    ``A..B`` (or ``A...B``), the contents at B. Otherwise the files in
+    the working tree are read, as ``git diff REF`` compares against them.
+    Staged and committed contents come through a single cat-file process.
+
+    Args:
+        scanner: Scanner to use
+        repo: Directory inside the repository
+        ref: Revision or range to diff against (default: the index, or HEAD with ``staged``)
+        staged: Scan what is staged for the next commit
+        paths: Limit the scan to these paths
+
+    Returns:
+        Iterator of a ScanResult per changed file, named by its path
+        relative to the current directory
+
+    Raises:
+        ValueError: If git fails, e.g. outside a repository or on an unknown revision
+    """
+    top = toplevel(repo)
+    changes = added_lines(repo, ref, staged, paths)
+
+    revision = None
+    if staged:
+        revision = ""
+    elif ref and ".." in ref:
+        revision = ref.split("..")[-1].lstrip(".") or "HEAD"
+    # git has been asked everything that can fail; the files are scanned as they are consumed
+    return _scan_files(scanner, top, changes, revision)
+
+
+def _scan_files(scanner, top: str, changes: Dict[str, List[Tuple[int, int]]],
+                revision: Optional[str]) -> Iterator[ScanResult]:
+    """Scan the added lines of each file, reading blobs at a revision or else the working tree."""
+    reader = BlobReader(top) if revision is not None and changes else None
+    try:
+        for path, ranges in changes.items():
+            full_path = os.path.join(top, path)
+            if reader is not None:
+                data = reader.read(f"{revision}:{path}")
+            else:
+                try:
+                    with open(full_path, 'rb') as f:
+                        data = f.read()
+                except OSError:
+                    data = None
+            if data is None or b'\0' in data[:8192]:
+                continue
+            yield scanner.scan_lines(data.decode(scanner.encoding, 'ignore'), ranges, os.path.relpath(full_path),
+                                     compact=not scanner.keep_alternates)
+    finally:
+        if reader is not None:
+            reader.close()
@@ -1,15 +1,74 @@
 """Masking strategies for PII redaction."""
 
+import functools
 import hashlib
-from pii_shield.models import MaskingStrategy
+import hmac
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from pii_shield.models import MaskingStrategy, MatchTable, PIIMatch
+from pii_shield.vault import TokenVault, shared_vault
+
+# Digests for HASH masking and the longest hex digest each can produce
+HASH_ALGORITHMS = {"blake2b": 128, "blake2s": 64, "sha256": 64}
+# Hex characters of each HASH replacement
+DEFAULT_HASH_LENGTH = 16
+# Distinct values whose digests are remembered by each Masker
+DEFAULT_MEMO_SIZE = 65536
 
 
 class Masker:
     """Applies masking strategies to PII values."""
 
-    def __init__(self, strategy: MaskingStrategy = MaskingStrategy.FULL):
+    def __init__(self, strategy: MaskingStrategy = MaskingStrategy.FULL,
+                 hash_key: Optional[Union[str, bytes]] = None, hash_length: int = DEFAULT_HASH_LENGTH,
+                 hash_algorithm: Optional[str] = None, memo_size: int = DEFAULT_MEMO_SIZE,
+                 vault: Optional[Union[TokenVault, str]] = None):
+        """
+        Args:
+            strategy: Masking strategy
+            hash_key: Secret key for HASH masking. Without one, values are
+                hashed unkeyed and short values such as SSNs can be recovered
+                by trying every candidate
+            hash_length: Hex characters of each HASH replacement
+            hash_algorithm: One of HASH_ALGORITHMS (default: blake2b with a
+                key, sha256 without, which matches earlier unkeyed output)
+            memo_size: Distinct values whose digests are remembered
+            vault: TokenVault, or the path of one, for TOKEN masking. Vaults
+                opened by path are shared by every Masker in the process.
+                Without one, each Masker gets its own in-memory vault
+        """
+        if hash_algorithm is None:
+            hash_algorithm = "blake2b" if hash_key is not None else "sha256"
+        if hash_algorithm not in HASH_ALGORITHMS:
+            raise ValueError(f"Unknown hash algorithm: {hash_algorithm}")
+        if not 1 <= hash_length <= HASH_ALGORITHMS[hash_algorithm]:
+            raise ValueError(f"hash_length must be between 1 and {HASH_ALGORITHMS[hash_algorithm]} "
+                             f"for {hash_algorithm}")
+        if isinstance(hash_key, str):
+            hash_key = hash_key.encode('utf-8')
+        if strategy == MaskingStrategy.HASH and hash_key is not None and hash_algorithm != "sha256":
+            max_key = getattr(hashlib, hash_algorithm).MAX_KEY_SIZE
+            if len(hash_key) > max_key:
+                raise ValueError(f"hash_key must be at most {max_key} bytes for {hash_algorithm} "
+                                 f"(got {len(hash_key)}); use sha256 for longer keys")
+        if isinstance(vault, str):
+            vault = shared_vault(vault)
         self.strategy = strategy
         self.token_counter = 0
+        self._vault = vault
+        # Constructor arguments, used to build matching maskers in worker processes
+        self.options: Dict[str, Any] = {
+            "strategy": strategy,
+            "hash_key": hash_key,
+            "hash_length": hash_length,
+            "hash_algorithm": hash_algorithm,
+            "memo_size": memo_size,
+            "vault": vault.path if vault is not None else None,
+        }
+        self.hash_length = hash_length
+        self.hash_algorithm = hash_algorithm
+        self._hash_key = hash_key
+        self._digest = functools.lru_cache(maxsize=memo_size)(self._compute_digest)
 
     def mask(self, value: str, pii_type: str) -> str:
         """
@@ -29,10 +88,97 @@ class Masker:
         elif self.strategy == MaskingStrategy.HASH:
             return self.hash_replace(value)
         elif self.strategy == MaskingStrategy.TOKEN:
-            return self.token_replace()
+            return self.token_replace(value, pii_type)
         else:
             return self.full_redact(pii_type)
 
+    def mask_many(self, values: Sequence[str], pii_types: Sequence[str]) -> List[str]:
+        """
+        Mask many values at once.
+
+        Equivalent to calling ``mask`` on each (value, type) pair in order,
+        but the strategy is dispatched once for the whole batch.
+
+        Args:
+            values: PII values to mask
+            pii_types: Type of each value
+
+        Returns:
+            Masked values, in order
+        """
+        if len(values) != len(pii_types):
+            raise ValueError("values and pii_types must have the same length")
+        if self.strategy == MaskingStrategy.PARTIAL:
+            return [self.partial_mask(value, pii_type) for value, pii_type in zip(values, pii_types)]
+        if self.strategy == MaskingStrategy.HASH:
+            digest = self._digest
+            return [digest(value) for value in values]
+        if self.strategy == MaskingStrategy.TOKEN:
+            token = self.vault.token
+            return [token(pii_type, value) for value, pii_type in zip(values, pii_types)]
+        return [f"[{pii_type}_REDACTED]" for pii_type in pii_types]
+
+    def apply(self, text: str, matches: Union[Iterable[PIIMatch], MatchTable]) -> str:
+        """
+        Mask every match in a text, in one pass over it.
+
+        Matches are located by their ``start`` and ``end`` offsets, so a
+        value that occurs several times is masked only where it was found.
+        Overlapping spans are merged and their union masked as one value,
+        of the type of the span starting first (the longest, then the most
+        confident, if several start together), so no part of any match is
+        left in clear text.
+
+        Args:
+            text: Text the matches were found in
+            matches: Matches with offsets into ``text``
+
+        Returns:
+            Text with each matched span replaced by its masked value
+        """
+        spans = self._spans(matches)
+        spans.sort()
+
+        kept = []
+        cursor = 0
+        for start, neg_end, _, pii_type in spans:
+            if start >= cursor:
+                cursor = -neg_end
+                kept.append([start, cursor, pii_type])
+            elif -neg_end > cursor:
+                # Runs past the span it overlaps, which grows to cover it
+                cursor = kept[-1][1] = -neg_end
+        if not kept:
+            return text
+
+        masked = self.mask_many([text[start:end] for start, end, _ in kept],
+                                [pii_type for _, _, pii_type in kept])
+        pieces = []
+        cursor = 0
+        for (start, end, _), replacement in zip(kept, masked):
+            pieces.append(text[cursor:start])
+            pieces.append(replacement)
+            cursor = end
+        pieces.append(text[cursor:])
+        return ''.join(pieces)
+
+    @staticmethod
+    def _spans(matches: Union[Iterable[PIIMatch], MatchTable]) -> List[Tuple[int, int, int, str]]:
+        """Return (start, -end, -confidence, type) for each match, for sorting."""
+        if isinstance(matches, MatchTable):
+            names = matches.type_names
+            spans = [(start, -end, -confidence, names[type_id]) for start, end, confidence, type_id
+                     in zip(matches.starts, matches.ends, matches.confidences, matches.type_ids)]
+            if spans and min(spans)[0] < 0:
+                raise ValueError("Cannot mask matches without offsets")
+            return spans
+        spans = []
+        for m in matches:
+            if m.start is None or m.end is None:
+                raise ValueError("Cannot mask matches without offsets")
+            spans.append((m.start, -m.end, -m.confidence, m.type))
+        return spans
+
     def full_redact(self, pii_type: str) -> str:
         """Replace with [TYPE_REDACTED]."""
         return f"[{pii_type}_REDACTED]"
@@ -85,11 +231,43 @@ class Masker:
             return "*" * len(value)
 
     def hash_replace(self, value: str) -> str:
-        """Replace with SHA256 hash (first 16 chars)."""
-        hash_obj = hashlib.sha256(value.encode())
-        return hash_obj.hexdigest()[:16]
-
-    def token_replace(self) -> str:
-        """Replace with unique token identifier."""
-        self.token_counter += 1
-        return f"PLACEHOLDER_{self.token_counter}"
+        """Replace with a hex digest of the value, keyed if the masker has a key."""
+        return self._digest(value)
+
+    def _compute_digest(self, value: str) -> str:
+        """Hash a value; called through the memo in ``_digest``."""
+        data = value.encode('utf-8', 'surrogateescape')
+        key = self._hash_key
+        if self.hash_algorithm == "sha256":
+            if key is None:
+                return hashlib.sha256(data).hexdigest()[:self.hash_length]
+            return hmac.digest(key, data, "sha256").hex()[:self.hash_length]
+        blake = hashlib.blake2b if self.hash_algorithm == "blake2b" else hashlib.blake2s
+        digest_size = (self.hash_length + 1) // 2
+        if key is None:
+            return blake(data, digest_size=digest_size).hexdigest()[:self.hash_length]
+        return blake(data, digest_size=digest_size, key=key).hexdigest()[:self.hash_length]
+
+    def token_replace(self, value: Optional[str] = None, pii_type: str = "PII") -> str:
+        """
+        Replace with the vault's stable token for the value.
+
+        Called without a value, as before tokens came from a vault, it
+        returns the next unique PLACEHOLDER_n instead.
+        """
+        if value is None:
+            self.token_counter += 1
+            return f"PLACEHOLDER_{self.token_counter}"
+        return self.vault.token(pii_type, value)
+
+    @property
+    def vault(self) -> TokenVault:
+        """The TokenVault used for TOKEN masking, created in memory on first use if none was given."""
+        if self._vault is None:
+            self._vault = TokenVault()
+        return self._vault
+
+    def flush(self) -> None:
+        """Write new tokens to the vault's database."""
+        if self._vault is not None:
+            self._vault.flush()
@@ -0,0 +1,221 @@
+"""Masked copies of directory trees."""
+
+import io
+import itertools
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from pii_shield.masker import Masker
+from pii_shield.models import MaskingStrategy
+from pii_shield.scanner import DIRECTORY_BATCH_SIZE, SNIFF_SIZE, Scanner
+
+# Manifest written to the root of a mask_directory output tree
+MANIFEST_NAME = '.pii-shield-manifest.json'
+
+
+def mask_directory(scanner: Scanner, dirpath: str, outdir: str, masker: Optional[Masker] = None,
+                   workers: int = 1, hardlink: bool = False) -> Dict[str, Any]:
+    """
+    Write a masked copy of a directory tree, as ``Scanner.mask_directory`` does.
+
+    Every file under ``dirpath`` is mirrored at the same relative path
+    under ``outdir``: files with PII are masked, files without are
+    copied (or hard-linked, if ``hardlink`` is set and the trees share
+    a filesystem), and binary or undecodable files are skipped.
+    Ignored directories and paths (see ``Scanner.iter_directory``) are
+    not mirrored at all.
+    Each file is written to a temporary name and renamed into place,
+    so an interrupted run never leaves a partly masked file. A
+    manifest of the run is written to MANIFEST_NAME in ``outdir``.
+
+    With more than one worker, files are sent in batches to a process
+    pool whose workers each build a Masker from the options of
+    ``masker``. TOKEN masking then needs a vault opened by path, so
+    that every worker hands out (and records) the same tokens.
+
+    Args:
+        scanner: Scanner to use
+        dirpath: Directory to mask recursively
+        outdir: Directory to write the masked tree to
+        masker: Masker whose options are used (default: full redaction)
+        workers: Number of worker processes (0 for one per CPU)
+        hardlink: Hard-link files without PII instead of copying them
+
+    Returns:
+        The manifest: file counts per status, finding counts per type,
+        and an entry for every file that was not copied unchanged
+    """
+    source, target = Path(dirpath).resolve(), Path(outdir).resolve()
+    if target == source or source in target.parents:
+        raise ValueError("Output directory must not be inside the input directory")
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    masker = masker or Masker()
+    if workers > 1 and masker.strategy == MaskingStrategy.TOKEN and masker.options["vault"] is None:
+        raise ValueError("TOKEN masking with several workers needs a vault path")
+
+    paths = scanner._walk(dirpath)
+    jobs = [(path, str(target / Path(path).relative_to(dirpath))) for path in paths]
+    target.mkdir(parents=True, exist_ok=True)
+
+    if workers <= 1:
+        entries = (_mask_candidate(scanner, src, dst, masker, hardlink) for src, dst in jobs)
+    else:
+        batches = [jobs[i:i + DIRECTORY_BATCH_SIZE] for i in range(0, len(jobs), DIRECTORY_BATCH_SIZE)]
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                       initargs=(scanner.options,))
+        entries = itertools.chain.from_iterable(
+            executor.map(_mask_batch, batches, itertools.repeat(masker.options), itertools.repeat(hardlink)))
+
+    counts = {"masked": 0, "copied": 0, "skipped": 0, "failed": 0}
+    findings: Dict[str, int] = {}
+    listed = []
+    try:
+        for entry in entries:
+            counts[entry["status"]] += 1
+            for pii_type, count in entry.get("summary", {}).items():
+                findings[pii_type] = findings.get(pii_type, 0) + count
+            if entry["status"] != "copied":
+                entry["path"] = str(Path(entry["path"]).relative_to(dirpath))
+                listed.append(entry)
+    finally:
+        if workers > 1:
+            executor.shutdown()
+
+    manifest = {
+        "source": str(source),
+        "output": str(target),
+        "strategy": masker.strategy.value,
+        "files": counts,
+        "findings": findings,
+        "entries": listed,
+    }
+    _write_atomic(str(target / MANIFEST_NAME), json.dumps(manifest, indent=2), 'utf-8')
+    return manifest
+
+
+def _mask_candidate(scanner: Scanner, src: str, dst: str, masker: Masker, hardlink: bool) -> Dict[str, Any]:
+    """Mask, copy or skip one file of a mask_directory run and describe what was done."""
+    try:
+        raw = open(src, 'rb')
+    except OSError:
+        return {"path": src, "status": "skipped"}
+    with raw:
+        if scanner._is_binary(raw.read(SNIFF_SIZE)):
+            return {"path": src, "status": "skipped"}
+        return _mask_open(scanner, raw, src, dst, masker, hardlink)
+
+
+def _mask_open(scanner: Scanner, raw: IO[bytes], src: str, dst: str, masker: Masker,
+               hardlink: bool) -> Dict[str, Any]:
+    """Mask or copy an open text file of a mask_directory run."""
+    try:
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        size = os.fstat(raw.fileno()).st_size
+        raw.seek(0)
+        # Undecodable bytes are carried through unchanged
+        with io.TextIOWrapper(raw, encoding=scanner.encoding, errors='surrogateescape', newline='') as f:
+            if size > scanner.stream_threshold:
+                summary: Dict[str, int] = {}
+                # New tokens are saved before the file that uses them is renamed into place
+                masked = _write_atomic(dst, scanner.mask_stream(f, masker, summary=summary),
+                                       scanner.encoding, src, keep=lambda: masker.flush() or bool(summary))
+            else:
+                text, result = scanner.mask_text(f.read(), masker, src)
+                summary = result.summary
+                masker.flush()
+                masked = bool(summary) and _write_atomic(dst, text, scanner.encoding, src)
+        if not masked:
+            _copy_atomic(src, dst, hardlink)
+            return {"path": src, "status": "copied"}
+        return {"path": src, "status": "masked", "matches": sum(summary.values()), "summary": summary}
+    except Exception as e:
+        return {"path": src, "status": "failed", "error": str(e)}
+
+
+# Per-process scanner used by mask_directory workers
+_worker_scanner: Optional[Scanner] = None
+# Maskers built in mask_directory workers, keyed by their options
+_worker_maskers: Dict[str, Masker] = {}
+
+
+def _init_worker(options: Dict[str, Any]) -> None:
+    """Build the scanner once per worker process."""
+    global _worker_scanner
+    _worker_scanner = Scanner(**options)
+
+
+def _mask_batch(jobs: List[Tuple[str, str]], masker_options: Dict[str, Any],
+                hardlink: bool) -> List[Dict[str, Any]]:
+    """Mask a batch of (source, destination) files in a worker process."""
+    key = repr(sorted(masker_options.items()))
+    masker = _worker_maskers.get(key)
+    if masker is None:
+        masker = _worker_maskers[key] = Masker(**masker_options)
+    return [_mask_candidate(_worker_scanner, src, dst, masker, hardlink) for src, dst in jobs]
+
+
+def _temp_path(path: str) -> str:
+    """Return a temporary name next to ``path`` for this process to write to."""
+    head, tail = os.path.split(path)
+    return os.path.join(head, f".{tail}.{os.getpid()}.tmp")
+
+
+def _write_atomic(path: str, content: Union[str, Iterable[str]], encoding: str,
+                  mode_from: Optional[str] = None, keep: Optional[Callable[[], bool]] = None) -> bool:
+    """
+    Write text to a temporary file and rename it over ``path``.
+
+    ``content`` may be a string or an iterable of pieces. If ``keep`` is
+    given, it is called once everything is written and the file is only
+    renamed into place if it returns True. Returns whether it was.
+    """
+    tmp = _temp_path(path)
+    try:
+        with open(tmp, 'w', encoding=encoding, errors='surrogateescape', newline='') as out:
+            if isinstance(content, str):
+                out.write(content)
+            else:
+                for piece in content:
+                    out.write(piece)
+        if keep is not None and not keep():
+            os.unlink(tmp)
+            return False
+        if mode_from is not None:
+            shutil.copymode(mode_from, tmp)
+        os.replace(tmp, path)
+        return True
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def _copy_atomic(src: str, dst: str, hardlink: bool) -> None:
+    """Copy (or hard-link) a file to a temporary name and rename it over ``dst``."""
+    tmp = _temp_path(dst)
+    try:
+        if os.path.lexists(tmp):
+            os.unlink(tmp)
+        linked = False
+        if hardlink:
+            try:
+                os.link(src, tmp)
+                linked = True
+            except OSError:
+                # Different filesystem, or links not supported: fall back to a copy
+                pass
+        if not linked:
+            shutil.copy2(src, tmp)
+        os.replace(tmp, dst)
+        if os.path.lexists(tmp):
+            # Renaming a link over another link to the same file leaves both in place
+            os.unlink(tmp)
+    except BaseException:
+        if os.path.lexists(tmp):
+            os.unlink(tmp)
+        raise
@@ -1,8 +1,11 @@
 """Data models for PII detection."""
 
+from array import array
 from dataclasses import dataclass
 from enum import Enum
-from typing import List, Dict
+from typing import Any, Iterable, Iterator, List, Dict, Optional, Union
+
+from pii_shield.tokenizer import Tokenizer
 
 
 class MaskingStrategy(Enum):
@@ -13,27 +16,271 @@ class MaskingStrategy(Enum):
     TOKEN = "token"
 
 
-@dataclass
 class PIIMatch:
-    """Represents a detected PII instance."""
-    type: str
-    value: str
-    confidence: int
-    line: int
-    column: int
-    context: str
+    """Represents a detected PII instance.
+
+    The context may be given as a string, or left to be extracted from the
+    scanned text on first access (see ``from_source``), so consumers that
+    never read it do not pay for it.
+    """
+
+    __slots__ = ("type", "value", "confidence", "line", "column", "start", "end", "alternates",
+                 "_context", "_source", "_source_start", "_tokenizer")
+
+    def __init__(self, type: str, value: str, confidence: int, line: int, column: int,
+                 context: Optional[str], start: Optional[int] = None, end: Optional[int] = None,
+                 alternates: Optional[List["PIIMatch"]] = None):
+        self.type = type
+        self.value = value
+        self.confidence = confidence
+        self.line = line
+        self.column = column
+        self.start = start
+        self.end = end
+        # Overlapping matches of other types suppressed in favour of this one
+        self.alternates = alternates
+        self._context = context
+        self._source: Optional[str] = None
+        self._source_start = 0
+        self._tokenizer: Optional[Tokenizer] = None
+
+    @classmethod
+    def from_source(cls, type: str, value: str, confidence: int, line: int, column: int,
+                    source: str, source_start: int, tokenizer: Tokenizer,
+                    start: Optional[int] = None, end: Optional[int] = None) -> "PIIMatch":
+        """
+        Create a match whose context is extracted from ``source`` when first read.
+
+        Args:
+            source: Text the match was found in; kept until the context is read
+            source_start: Offset of the match in ``source``
+            tokenizer: Tokenizer that extracts the context window
+        """
+        match = cls(type, value, confidence, line, column, None, start, end)
+        match._source = source
+        match._source_start = source_start
+        match._tokenizer = tokenizer
+        return match
+
+    @property
+    def context(self) -> str:
+        """Text around the match, whitespace-normalized and truncated."""
+        if self._context is None:
+            if self._source is None:
+                return ''
+            start = self._source_start
+            self._context = self._tokenizer.get_context_window(self._source, start, start + len(self.value))
+            self._source = self._tokenizer = None
+        return self._context
+
+    @context.setter
+    def context(self, context: str) -> None:
+        self._context = context
+        self._source = self._tokenizer = None
 
     def __repr__(self) -> str:
         return f"PIIMatch(type={self.type}, confidence={self.confidence}, line={self.line})"
 
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, PIIMatch):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    __hash__ = None  # mutable, like the dataclass it replaces
+
+    def __reduce__(self):
+        # Pickle the extracted context rather than the whole source text
+        return (PIIMatch, (self.type, self.value, self.confidence, self.line, self.column,
+                           self.context, self.start, self.end, self.alternates))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the match as a JSON-serializable dict."""
+        data = {
+            "type": self.type,
+            "value": self.value,
+            "confidence": self.confidence,
+            "line": self.line,
+            "column": self.column,
+            "context": self.context,
+            "start": self.start,
+            "end": self.end,
+        }
+        if self.alternates is not None:
+            data["alternates"] = [m.to_dict() for m in self.alternates]
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PIIMatch":
+        """Rebuild a match from the output of to_dict()."""
+        data = dict(data)
+        if data.get("alternates") is not None:
+            data["alternates"] = [cls.from_dict(m) for m in data["alternates"]]
+        return cls(**data)
+
+
+class MatchTable:
+    """Column-oriented storage for the matches of one scan.
+
+    Numeric fields live in typed arrays and types are small ids into
+    ``type_names``. With a ``source`` text, values are (start, end) spans
+    into it and contexts are only extracted when read, so a match costs a
+    few dozen bytes instead of an object with its own strings.
+    Without one (e.g. for streamed scans, whose text is not kept), values
+    and contexts are stored as strings.
+
+    The table is a read-only sequence of PIIMatch rows, built on access,
+    so it can stand in for a list of matches in a ScanResult.
+    """
+
+    def __init__(self, source: Optional[str] = None, tokenizer: Optional[Tokenizer] = None):
+        self.source = source
+        self.tokenizer = tokenizer or Tokenizer()
+        self.type_names: List[str] = []
+        self._type_ids: Dict[str, int] = {}
+        self.type_ids = array('H')
+        self.starts = array('q')
+        self.ends = array('q')
+        self.lines = array('q')
+        self.columns = array('q')
+        self.confidences = array('b')
+        self.values: Optional[List[str]] = None if source is not None else []
+        self.contexts: Optional[List[str]] = None if source is not None else []
+
+    @classmethod
+    def from_matches(cls, matches: Iterable[PIIMatch]) -> "MatchTable":
+        """Build a source-less table from match objects."""
+        table = cls()
+        for m in matches:
+            table.append(m.type, m.start, m.end, m.line, m.column, m.confidence, m.value, m.context)
+        return table
+
+    def append(self, pii_type: str, start: Optional[int], end: Optional[int], line: int, column: int,
+               confidence: int, value: Optional[str] = None, context: Optional[str] = None) -> None:
+        """Add a match; ``value`` and ``context`` are required without a source."""
+        type_id = self._type_ids.get(pii_type)
+        if type_id is None:
+            type_id = self._type_ids[pii_type] = len(self.type_names)
+            self.type_names.append(pii_type)
+        self.type_ids.append(type_id)
+        self.starts.append(-1 if start is None else start)
+        self.ends.append(-1 if end is None else end)
+        self.lines.append(line)
+        self.columns.append(column)
+        self.confidences.append(confidence)
+        if self.source is None:
+            self.values.append(value)
+            self.contexts.append(context)
+
+    def __len__(self) -> int:
+        return len(self.type_ids)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("MatchTable index out of range")
+
+        start, end = self.starts[i], self.ends[i]
+        if self.source is None:
+            return PIIMatch(
+                type=self.type_names[self.type_ids[i]],
+                value=self.values[i],
+                confidence=self.confidences[i],
+                line=self.lines[i],
+                column=self.columns[i],
+                context=self.contexts[i],
+                start=None if start < 0 else start,
+                end=None if end < 0 else end
+            )
+        return PIIMatch.from_source(
+            type=self.type_names[self.type_ids[i]],
+            value=self.source[start:end],
+            confidence=self.confidences[i],
+            line=self.lines[i],
+            column=self.columns[i],
+            source=self.source,
+            source_start=start,
+            tokenizer=self.tokenizer,
+            start=start,
+            end=end
+        )
+
+    def __iter__(self) -> Iterator[PIIMatch]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def __repr__(self) -> str:
+        return f"MatchTable(rows={len(self)}, types={self.type_names})"
+
+    def type_of(self, i: int) -> str:
+        """Return the PII type of a row without building it."""
+        return self.type_names[self.type_ids[i]]
+
+    def summary(self) -> Dict[str, int]:
+        """Count matches per PII type."""
+        counts = [0] * len(self.type_names)
+        for type_id in self.type_ids:
+            counts[type_id] += 1
+        return {name: count for name, count in zip(self.type_names, counts) if count}
+
+    def sort(self, type_order: Dict[str, int]) -> None:
+        """Order rows by line, then by ``type_order`` of their type."""
+        rank = [type_order[name] for name in self.type_names]
+        order = sorted(range(len(self)), key=lambda i: (self.lines[i], rank[self.type_ids[i]]))
+        for name in ("type_ids", "starts", "ends", "lines", "columns", "confidences"):
+            column = getattr(self, name)
+            setattr(self, name, array(column.typecode, [column[i] for i in order]))
+        if self.source is None:
+            self.values = [self.values[i] for i in order]
+            self.contexts = [self.contexts[i] for i in order]
+
 
 @dataclass
 class ScanResult:
     """Results from scanning a file or text."""
     file: str
-    matches: List[PIIMatch]
+    matches: Union[List[PIIMatch], MatchTable]
     summary: Dict[str, int]
 
     def __repr__(self) -> str:
         total = sum(self.summary.values())
         return f"ScanResult(file={self.file}, total_matches={total})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the result as a JSON-serializable dict."""
+        return {
+            "file": self.file,
+            "matches": [m.to_dict() for m in self.matches],
+            "summary": dict(self.summary),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ScanResult":
+        """Rebuild a result from the output of to_dict()."""
+        return cls(
+            file=data["file"],
+            matches=[PIIMatch.from_dict(m) for m in data["matches"]],
+            summary=dict(data["summary"]),
+        )
+
+
+@dataclass
+class BatchScanResult:
+    """Results from scanning a batch of records with Scanner.scan_texts()."""
+    count: int
+    matches: List[PIIMatch]
+    ids: List[Any]
+    summary: Dict[str, int]
+
+    def __repr__(self) -> str:
+        total = sum(self.summary.values())
+        return f"BatchScanResult(records={self.count}, total_matches={total})"
+
+    def by_record(self) -> Dict[Any, List[PIIMatch]]:
+        """Group matches by the id of the record they were found in."""
+        grouped: Dict[Any, List[PIIMatch]] = {}
+        for record_id, match in zip(self.ids, self.matches):
+            grouped.setdefault(record_id, []).append(match)
+        return grouped
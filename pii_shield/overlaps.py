@@ -0,0 +1,62 @@
+"""Resolution of overlapping matches of different PII types."""
+
+from typing import Dict, List
+
+from pii_shield.models import PIIMatch
+
+
+def resolve_overlaps(matches: List[PIIMatch], rank: Dict[str, int],
+                     keep_alternates: bool = False) -> List[PIIMatch]:
+    """
+    Keep the best match wherever matches overlap.
+
+    Matches are swept in offset order and grouped into clusters of
+    transitively overlapping spans. Within a cluster, matches are taken
+    best first (highest confidence, then lowest ``rank`` of their type,
+    then longest) as long as they do not overlap a match already taken,
+    so disjoint matches that merely share a neighbour both survive.
+
+    Args:
+        matches: Matches with ``start`` and ``end`` offsets in one text
+        rank: Precedence of each type, lower wins; unranked types come last
+        keep_alternates: Record suppressed matches in the ``alternates`` of
+            the first kept match they overlap
+
+    Returns:
+        Kept matches, in offset order
+    """
+    if len(matches) < 2:
+        return list(matches)
+
+    kept: List[PIIMatch] = []
+    cluster: List[PIIMatch] = []
+    cluster_end = -1
+    for match in sorted(matches, key=lambda m: (m.start, -m.end)):
+        if cluster and match.start >= cluster_end:
+            kept.extend(_pick(cluster, rank, keep_alternates))
+            cluster = []
+        if not cluster:
+            cluster_end = match.end
+        cluster.append(match)
+        cluster_end = max(cluster_end, match.end)
+    kept.extend(_pick(cluster, rank, keep_alternates))
+    return kept
+
+
+def _pick(cluster: List[PIIMatch], rank: Dict[str, int], keep_alternates: bool) -> List[PIIMatch]:
+    """Choose non-overlapping matches from a cluster, best first."""
+    if len(cluster) == 1:
+        return cluster
+    unranked = len(rank)
+    chosen: List[PIIMatch] = []
+    for match in sorted(cluster, key=lambda m: (-m.confidence, rank.get(m.type, unranked),
+                                                m.start - m.end, m.start)):
+        winner = next((c for c in chosen if match.start < c.end and c.start < match.end), None)
+        if winner is None:
+            chosen.append(match)
+        elif keep_alternates:
+            if winner.alternates is None:
+                winner.alternates = []
+            winner.alternates.append(match)
+    chosen.sort(key=lambda m: m.start)
+    return chosen
@@ -1,7 +1,7 @@
 """PII pattern definitions and metadata."""
 
 import re
-from typing import Dict, List, Tuple
+from typing import Dict, List, NamedTuple, Tuple
 
 # Pattern definitions: (regex, base_confidence, description)
 PATTERNS: Dict[str, Tuple[re.Pattern, int, str]] = {
@@ -108,6 +108,48 @@ PATTERNS: Dict[str, Tuple[re.Pattern, int, str]] = {
     ),
 }
 
+# Which type wins when equally confident matches overlap, most specific first
+DEFAULT_PRECEDENCE: List[str] = [
+    "API_KEY_AWS", "API_KEY_OPENAI", "API_KEY_STRIPE", "API_KEY_GITHUB", "JWT",
+    "EMAIL", "IBAN", "CREDIT_CARD", "SSN", "MRN", "DOB", "IP_ADDRESS", "PHONE",
+    "PASSPORT", "DRIVERS_LICENSE", "NPI", "ROUTING_NUMBER", "ZIP_CODE",
+]
+
+
+class PatternAnchor(NamedTuple):
+    """Cheap necessary condition for a pattern to match on a line.
+
+    A line can only contain a match if it contains one of ``literals``
+    (when given) and a run of at least ``min_digits`` consecutive digits
+    (when non-zero).
+    """
+    literals: Tuple[str, ...] = ()
+    min_digits: int = 0
+    ignore_case: bool = False
+
+
+# Anchors used to skip regex work on lines that cannot match a pattern
+PATTERN_ANCHORS: Dict[str, PatternAnchor] = {
+    "SSN": PatternAnchor(literals=("-",), min_digits=4),
+    "PASSPORT": PatternAnchor(min_digits=6),
+    "DRIVERS_LICENSE": PatternAnchor(min_digits=7),
+    "CREDIT_CARD": PatternAnchor(min_digits=4),
+    "IBAN": PatternAnchor(min_digits=2),
+    "ROUTING_NUMBER": PatternAnchor(min_digits=9),
+    "EMAIL": PatternAnchor(literals=("@",)),
+    "PHONE": PatternAnchor(min_digits=4),
+    "IP_ADDRESS": PatternAnchor(literals=(".",), min_digits=1),
+    "API_KEY_AWS": PatternAnchor(literals=("AKIA",)),
+    "API_KEY_OPENAI": PatternAnchor(literals=("sk-",)),
+    "API_KEY_STRIPE": PatternAnchor(literals=("sk_live_",)),
+    "API_KEY_GITHUB": PatternAnchor(literals=("ghp_",)),
+    "JWT": PatternAnchor(literals=("eyJ",)),
+    "MRN": PatternAnchor(literals=("mrn",), min_digits=6, ignore_case=True),
+    "NPI": PatternAnchor(min_digits=10),
+    "DOB": PatternAnchor(literals=("/",), min_digits=4),
+    "ZIP_CODE": PatternAnchor(min_digits=5),
+}
+
 
 def get_pattern_categories() -> Dict[str, List[str]]:
     """Return patterns organized by category."""
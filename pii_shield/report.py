@@ -1,9 +1,17 @@
 """HTML report generator for pii-shield scan results."""
 
 import os
+import re
+import shutil
 import tempfile
-import webbrowser
 from datetime import datetime, timezone
+from html import escape
+from urllib.parse import quote
+
+# Findings listed on each page of a file's details
+DEFAULT_PAGE_SIZE = 1000
+# Names of the per-file pages written by export_html
+_PAGE_NAME = re.compile(r"file-\d+(-\d+)?\.html")
 
 
 def _base_style():
@@ -47,68 +55,82 @@ def _base_style():
     .bar { height:8px; border-radius:4px; }
     .footer { text-align:center; color:var(--muted); font-size:0.8rem; margin-top:2rem; padding-top:1rem; border-top:1px solid var(--border); }
     .footer a { color:var(--blue); text-decoration:none; }
+    .pager { display:flex; gap:1rem; align-items:center; justify-content:center; margin:1rem 0; color:var(--muted); font-size:0.85rem; }
+    .pager a, td a { color:var(--blue); text-decoration:none; }
     """
 
 
-def generate_html(results):
-    """Generate HTML report from scan results.
+def _page_start(title, subtitle):
+    """Return the head of a report page, up to and including its header."""
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+<title>{escape(title)}</title>
+<style>{_base_style()}</style>
+</head>
+<body>
 
-    Args:
-        results: List of ScanResult objects
+<div class="header">
+    <h1>{escape(title)}</h1>
+    <div class="subtitle">{subtitle}</div>
+</div>
+"""
 
-    Returns:
-        HTML string
-    """
-    now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
-    total_files = len(results)
-    total_matches = sum(len(r.matches) for r in results)
-    files_with_pii = sum(1 for r in results if r.matches)
 
-    # Aggregate by type
-    type_counts = {}
-    for r in results:
-        for m in r.matches:
-            type_counts[m.type] = type_counts.get(m.type, 0) + 1
+_PAGE_END = """
+<div class="footer">
+    <p>Generated by <a href="https://pypi.org/project/pii-shield/">pii-shield</a> &mdash; Context-aware PII detection</p>
+</div>
 
-    status = "CLEAN" if total_matches == 0 else f"{total_matches} FOUND"
-    status_class = "pass" if total_matches == 0 else "fail"
+</body>
+</html>"""
 
-    # Type summary cards
-    type_html = ""
-    for ptype, count in sorted(type_counts.items(), key=lambda x: -x[1]):
-        type_html += f'<div class="card"><div class="label">{ptype}</div><div class="value warn">{count}</div></div>'
+_FINDINGS_HEAD = "<table><thead><tr><th>File</th><th>Type</th><th>Value</th><th>Confidence</th><th>Location</th><th>Context</th></tr></thead><tbody>"
+_FILE_FINDINGS_HEAD = "<table><thead><tr><th>Type</th><th>Value</th><th>Confidence</th><th>Location</th><th>Context</th></tr></thead><tbody>"
+_TABLE_END = "</tbody></table>"
+_NO_FINDINGS = "<p style='color:var(--green);'>No PII detected. All clear.</p>"
 
-    # Match rows
-    rows_html = ""
-    for r in results:
-        for m in r.matches:
-            conf_class = "conf-high" if m.confidence >= 90 else "conf-med" if m.confidence >= 70 else "conf-low"
-            masked = m.value[:3] + "***" + m.value[-2:] if len(m.value) > 5 else "***"
-            rows_html += f"""
-            <tr>
-                <td class="mono">{r.file}</td>
+
+def _finding_row(file, m):
+    """Return the table row of one finding; without a file, the File column is left out."""
+    conf_class = "conf-high" if m.confidence >= 90 else "conf-med" if m.confidence >= 70 else "conf-low"
+    masked = m.value[:3] + "***" + m.value[-2:] if len(m.value) > 5 else "***"
+    file_cell = f'\n                <td class="mono">{escape(file)}</td>' if file is not None else ""
+    return f"""
+            <tr>{file_cell}
                 <td><span class="badge {conf_class}">{m.type}</span></td>
-                <td class="mono">{masked}</td>
+                <td class="mono">{escape(masked)}</td>
                 <td><span class="badge {conf_class}">{m.confidence}%</span></td>
                 <td>Line {m.line}</td>
-                <td class="context">{m.context[:60]}...</td>
+                <td class="context">{escape(m.context[:60])}...</td>
             </tr>"""
 
-    html = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-<meta charset="UTF-8">
-<meta name="viewport" content="width=device-width, initial-scale=1.0">
-<title>pii-shield Scan Report</title>
-<style>{_base_style()}</style>
-</head>
-<body>
 
-<div class="header">
-    <h1>pii-shield Scan Report</h1>
-    <div class="subtitle">PII Detection Results &mdash; {now}</div>
-</div>
+class _Totals:
+    """Running totals of a scan, for the summary cards."""
 
+    def __init__(self):
+        self.files = 0
+        self.files_with_pii = 0
+        self.matches = 0
+        self.type_counts = {}
+
+    def add(self, result):
+        """Count one scan result."""
+        self.files += 1
+        if result.matches:
+            self.files_with_pii += 1
+        for ptype, count in result.summary.items():
+            self.matches += count
+            self.type_counts[ptype] = self.type_counts.get(ptype, 0) + count
+
+    def cards(self):
+        """Return the summary cards and the findings-by-type section."""
+        status = "CLEAN" if self.matches == 0 else f"{self.matches} FOUND"
+        status_class = "pass" if self.matches == 0 else "fail"
+        html = f"""
 <div class="cards">
     <div class="card">
         <div class="label">Status</div>
@@ -116,39 +138,144 @@ def generate_html(results):
     </div>
     <div class="card">
         <div class="label">Files Scanned</div>
-        <div class="value">{total_files}</div>
+        <div class="value">{self.files}</div>
     </div>
     <div class="card">
         <div class="label">Files with PII</div>
-        <div class="value {"fail" if files_with_pii else "pass"}">{files_with_pii}</div>
+        <div class="value {"fail" if self.files_with_pii else "pass"}">{self.files_with_pii}</div>
     </div>
     <div class="card">
         <div class="label">Total Findings</div>
-        <div class="value {"fail" if total_matches else "pass"}">{total_matches}</div>
+        <div class="value {"fail" if self.matches else "pass"}">{self.matches}</div>
     </div>
 </div>
+"""
+        if self.type_counts:
+            type_html = "".join(
+                f'<div class="card"><div class="label">{ptype}</div><div class="value warn">{count}</div></div>'
+                for ptype, count in sorted(self.type_counts.items(), key=lambda x: -x[1])
+            )
+            html += f"\n<div class='section'><h2>Findings by Type</h2><div class='cards'>{type_html}</div></div>\n"
+        return html
 
-{"<div class='section'><h2>Findings by Type</h2><div class='cards'>" + type_html + "</div></div>" if type_counts else ""}
 
-<div class="section">
-    <h2>Detailed Findings</h2>
-    {"<table><thead><tr><th>File</th><th>Type</th><th>Value</th><th>Confidence</th><th>Location</th><th>Context</th></tr></thead><tbody>" + rows_html + "</tbody></table>" if rows_html else "<p style='color:var(--green);'>No PII detected. All clear.</p>"}
-</div>
+def _timestamp():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
 
-<div class="footer">
-    <p>Generated by <a href="https://pypi.org/project/pii-shield/">pii-shield</a> &mdash; Context-aware PII detection</p>
-</div>
 
-</body>
-</html>"""
-    return html
+def generate_html(results):
+    """Generate a single-page HTML report from scan results.
 
+    Suited to small scans; export_html splits large ones into pages.
+
+    Args:
+        results: List of ScanResult objects
+
+    Returns:
+        HTML string
+    """
+    totals = _Totals()
+    rows = []
+    for r in results:
+        totals.add(r)
+        rows.extend(_finding_row(r.file, m) for m in r.matches)
 
-def export_html(results, output_path=None):
-    """Generate and save HTML report, return file path."""
-    html = generate_html(results)
+    return "".join([
+        _page_start("pii-shield Scan Report", f"PII Detection Results &mdash; {_timestamp()}"),
+        totals.cards(),
+        '\n<div class="section">\n    <h2>Detailed Findings</h2>\n    ',
+        _FINDINGS_HEAD + "".join(rows) + _TABLE_END if rows else _NO_FINDINGS,
+        "\n</div>\n",
+        _PAGE_END,
+    ])
+
+
+def _page_name(number, page):
+    """Return the file name of a page of findings for the number-th file with PII."""
+    return f"file-{number:05d}.html" if page == 1 else f"file-{number:05d}-{page}.html"
+
+
+def _write_file_pages(result, pages_dir, number, index_link, page_size):
+    """Write the findings of one file as pages of page_size rows; return the first page's name."""
+    matches = result.matches
+    page_count = (len(matches) + page_size - 1) // page_size
+    for page in range(1, page_count + 1):
+        links = [f'<a href="{index_link}">&larr; Index</a>']
+        if page > 1:
+            links.append(f'<a href="{_page_name(number, page - 1)}">Previous</a>')
+        links.append(f"Page {page} of {page_count}")
+        if page < page_count:
+            links.append(f'<a href="{_page_name(number, page + 1)}">Next</a>')
+        pager = '<div class="pager">' + "".join(f"<span>{link}</span>" for link in links) + "</div>"
+
+        with open(os.path.join(pages_dir, _page_name(number, page)), "w", encoding="utf-8") as f:
+            f.write(_page_start("pii-shield Findings", f"{escape(result.file)} &mdash; {len(matches)} findings"))
+            f.write(pager)
+            f.write('\n<div class="section">\n    ')
+            f.write(_FILE_FINDINGS_HEAD)
+            for i in range((page - 1) * page_size, min(page * page_size, len(matches))):
+                f.write(_finding_row(None, matches[i]))
+            f.write(_TABLE_END)
+            f.write("\n</div>\n")
+            f.write(pager)
+            f.write(_PAGE_END)
+    return _page_name(number, 1)
+
+
+def export_html(results, output_path=None, page_size=DEFAULT_PAGE_SIZE):
+    """Write an HTML report and return the path of its index page.
+
+    The index page holds the summary cards and one row per file with PII.
+    Each file's findings go to their own pages of page_size rows, in a
+    directory next to the index named after it (report.html gets
+    report_files/). Pages are written as results arrive, and the cards
+    come from running totals, so memory use does not grow with the
+    number of findings.
+
+    Args:
+        results: Iterable of ScanResult objects, consumed once
+        output_path: Path of the index page (default: pii-shield-report.html in the temp directory)
+        page_size: Findings per page
+
+    Returns:
+        Path of the index page
+    """
     if not output_path:
         output_path = os.path.join(tempfile.gettempdir(), "pii-shield-report.html")
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(html)
+    pages_dir = os.path.splitext(output_path)[0] + "_files"
+    os.makedirs(pages_dir, exist_ok=True)
+    # Pages of an earlier report that this one would not overwrite
+    for name in os.listdir(pages_dir):
+        if _PAGE_NAME.fullmatch(name):
+            os.remove(os.path.join(pages_dir, name))
+    pages_link = quote(os.path.basename(pages_dir))
+    index_link = "../" + quote(os.path.basename(output_path))
+
+    totals = _Totals()
+    # File rows wait on disk until the totals for the cards above them are known
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as index_rows:
+        for result in results:
+            totals.add(result)
+            if result.matches:
+                first = _write_file_pages(result, pages_dir, totals.files_with_pii, index_link, page_size)
+                index_rows.write(f"""
+            <tr>
+                <td class="mono"><a href="{pages_link}/{first}">{escape(result.file)}</a></td>
+                <td>{len(result.matches)}</td>
+                <td>{", ".join(f"{ptype} ({count})" for ptype, count in result.summary.items())}</td>
+            </tr>""")
+        index_rows.seek(0)
+
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(_page_start("pii-shield Scan Report", f"PII Detection Results &mdash; {_timestamp()}"))
+            f.write(totals.cards())
+            f.write('\n<div class="section">\n    <h2>Files with Findings</h2>\n    ')
+            if totals.files_with_pii:
+                f.write("<table><thead><tr><th>File</th><th>Findings</th><th>Types</th></tr></thead><tbody>")
+                shutil.copyfileobj(index_rows, f)
+                f.write(_TABLE_END)
+            else:
+                f.write(_NO_FINDINGS)
+            f.write("\n</div>\n")
+            f.write(_PAGE_END)
     return output_path
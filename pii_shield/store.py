@@ -0,0 +1,237 @@
+"""SQLite store of scan findings for later queries."""
+
+import hashlib
+import os
+import secrets
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pii_shield.models import MatchTable, ScanResult
+
+# Finding rows inserted per transaction
+_INSERT_BATCH = 50000
+# Page cache of the connection, so index pages stay in memory during bulk inserts
+_CACHE_KIB = 64 * 1024
+
+
+class FindingsStore:
+    """
+    Findings of many scans, kept in one SQLite file.
+
+    Each scan run is a row in ``scans``; its findings are rows of
+    ``findings`` holding the file, position, type and confidence of each
+    match. Matched values are not stored. Instead each finding carries a
+    keyed 64-bit BLAKE2b fingerprint of its value, so "where does this key
+    appear" is an indexed lookup of the key's fingerprint. The key is
+    generated with the store and kept in it.
+
+    Rows are buffered and inserted _INSERT_BATCH at a time, each batch in
+    one transaction. Findings are indexed by type, file and fingerprint.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=60)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(f"PRAGMA cache_size=-{_CACHE_KIB}")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value BLOB NOT NULL);
+            CREATE TABLE IF NOT EXISTS scans (
+                id INTEGER PRIMARY KEY,
+                root TEXT NOT NULL,
+                started REAL NOT NULL,
+                finished REAL,
+                version TEXT NOT NULL,
+                fingerprint TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS files (
+                id INTEGER PRIMARY KEY,
+                path TEXT NOT NULL UNIQUE
+            );
+            CREATE TABLE IF NOT EXISTS findings (
+                scan_id INTEGER NOT NULL,
+                file_id INTEGER NOT NULL,
+                line INTEGER NOT NULL,
+                col INTEGER NOT NULL,
+                type TEXT NOT NULL,
+                confidence INTEGER NOT NULL,
+                value_fp INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS findings_type ON findings (type, scan_id);
+            CREATE INDEX IF NOT EXISTS findings_file ON findings (file_id, scan_id);
+            CREATE INDEX IF NOT EXISTS findings_value ON findings (value_fp);
+        """)
+        # Whichever process creates the store first decides its key
+        self._conn.execute("INSERT OR IGNORE INTO meta VALUES ('key', ?)", (secrets.token_bytes(32),))
+        self._conn.commit()
+        self._key = bytes(self._conn.execute("SELECT value FROM meta WHERE name = 'key'").fetchone()[0])
+        self._file_ids: Dict[str, int] = {}
+        self._pending: List[Tuple[int, int, int, int, str, int, int]] = []
+
+    def __enter__(self) -> "FindingsStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def fingerprint(self, value: str) -> int:
+        """Return the fingerprint stored for a matched value, a signed 64-bit integer."""
+        digest = hashlib.blake2b(value.encode('utf-8', 'surrogateescape'), key=self._key, digest_size=8).digest()
+        return int.from_bytes(digest, 'big', signed=True)
+
+    def begin_scan(self, root: str, scanner_fingerprint: str) -> int:
+        """Record the start of a scan run and return its id."""
+        from pii_shield import __version__
+
+        cursor = self._conn.execute(
+            "INSERT INTO scans (root, started, version, fingerprint) VALUES (?, ?, ?, ?)",
+            (root, time.time(), __version__, scanner_fingerprint),
+        )
+        self._conn.commit()
+        return cursor.lastrowid
+
+    def finish_scan(self, scan_id: int) -> None:
+        """Write the scan's remaining findings and mark it finished."""
+        self.flush()
+        self._conn.execute("UPDATE scans SET finished = ? WHERE id = ?", (time.time(), scan_id))
+        self._conn.commit()
+
+    def add(self, scan_id: int, result: ScanResult) -> None:
+        """Queue the findings of one result for insertion."""
+        if not result.matches:
+            return
+        file_id = self._file_id(result.file)
+        fingerprint = self.fingerprint
+        matches = result.matches
+        if isinstance(matches, MatchTable):
+            # Read the columns directly instead of building a PIIMatch per row
+            names = matches.type_names
+            if matches.source is not None:
+                source = matches.source
+                values = (source[start:end] for start, end in zip(matches.starts, matches.ends))
+            else:
+                values = iter(matches.values)
+            self._pending.extend(
+                (scan_id, file_id, line, column, names[type_id], confidence, fingerprint(value))
+                for line, column, type_id, confidence, value
+                in zip(matches.lines, matches.columns, matches.type_ids, matches.confidences, values)
+            )
+        else:
+            self._pending.extend(
+                (scan_id, file_id, m.line, m.column, m.type, m.confidence, fingerprint(m.value))
+                for m in matches
+            )
+        if len(self._pending) >= _INSERT_BATCH:
+            self.flush()
+
+    def record(self, scan_id: int, results: Iterable[ScanResult]) -> Iterator[ScanResult]:
+        """Add results as they pass through, for scans that are also being reported."""
+        for result in results:
+            self.add(scan_id, result)
+            yield result
+
+    def _file_id(self, path: str) -> int:
+        """Return the id of a file path, adding it if it is new."""
+        file_id = self._file_ids.get(path)
+        if file_id is None:
+            self._conn.execute("INSERT OR IGNORE INTO files (path) VALUES (?)", (path,))
+            file_id = self._conn.execute("SELECT id FROM files WHERE path = ?", (path,)).fetchone()[0]
+            self._file_ids[path] = file_id
+        return file_id
+
+    def flush(self) -> None:
+        """Insert queued findings in one transaction."""
+        if self._pending:
+            self._conn.executemany("INSERT INTO findings VALUES (?, ?, ?, ?, ?, ?, ?)", self._pending)
+            self._pending = []
+        self._conn.commit()
+
+    def close(self) -> None:
+        """Insert queued findings and close the database."""
+        self.flush()
+        self._conn.close()
+
+    def scans(self) -> List[Dict[str, Any]]:
+        """Return every scan run with its finding count, oldest first."""
+        rows = self._conn.execute("""
+            SELECT s.id, s.root, s.started, s.finished, s.version,
+                   (SELECT COUNT(*) FROM findings f WHERE f.scan_id = s.id)
+            FROM scans s ORDER BY s.id
+        """)
+        keys = ("id", "root", "started", "finished", "version", "findings")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def latest_scan(self) -> Optional[int]:
+        """Return the id of the most recent scan, or None if there are none."""
+        return self._conn.execute("SELECT MAX(id) FROM scans").fetchone()[0]
+
+    def summary(self, scan_id: Optional[int] = None, pii_type: Optional[str] = None) -> Dict[str, int]:
+        """Count findings per type, most frequent first."""
+        where, params = self._filters(scan_id=scan_id, pii_type=pii_type)
+        rows = self._conn.execute(
+            f"SELECT type, COUNT(*) AS n FROM findings f {where} GROUP BY type ORDER BY n DESC, type", params
+        )
+        return dict(rows.fetchall())
+
+    def top_files(self, limit: int = 10, scan_id: Optional[int] = None,
+                  pii_type: Optional[str] = None) -> List[Tuple[str, int]]:
+        """Return the files with the most findings and their counts."""
+        where, params = self._filters(scan_id=scan_id, pii_type=pii_type)
+        rows = self._conn.execute(f"""
+            SELECT p.path, COUNT(*) AS n FROM findings f JOIN files p ON p.id = f.file_id {where}
+            GROUP BY f.file_id ORDER BY n DESC, p.path LIMIT ?
+        """, params + [limit])
+        return rows.fetchall()
+
+    def find(self, value: Optional[str] = None, pii_type: Optional[str] = None,
+             file: Optional[str] = None, scan_id: Optional[int] = None,
+             limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Look up individual findings.
+
+        Args:
+            value: Only findings of this exact value
+            pii_type: Only findings of this type
+            file: Only files matching this glob pattern
+            scan_id: Only findings of this scan
+            limit: Maximum number of findings returned
+
+        Yields:
+            Dicts with scan, file, line, column, type and confidence
+        """
+        where, params = self._filters(scan_id=scan_id, pii_type=pii_type, file=file,
+                                      value_fp=self.fingerprint(value) if value is not None else None)
+        sql = f"""
+            SELECT f.scan_id, p.path, f.line, f.col, f.type, f.confidence
+            FROM findings f JOIN files p ON p.id = f.file_id {where}
+            ORDER BY f.scan_id, p.path, f.line, f.col
+        """
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        keys = ("scan", "file", "line", "column", "type", "confidence")
+        for row in self._conn.execute(sql, params):
+            yield dict(zip(keys, row))
+
+    def _filters(self, scan_id: Optional[int] = None, pii_type: Optional[str] = None,
+                 file: Optional[str] = None, value_fp: Optional[int] = None) -> Tuple[str, List[Any]]:
+        """Build the WHERE clause (over findings ``f``) for the given filters."""
+        clauses: List[str] = []
+        params: List[Any] = []
+        if scan_id is not None:
+            clauses.append("f.scan_id = ?")
+            params.append(scan_id)
+        if pii_type is not None:
+            clauses.append("f.type = ?")
+            params.append(pii_type)
+        if value_fp is not None:
+            clauses.append("f.value_fp = ?")
+            params.append(value_fp)
+        if file is not None:
+            clauses.append("f.file_id IN (SELECT id FROM files WHERE path GLOB ?)")
+            params.append(file)
+        return ("WHERE " + " AND ".join(clauses)) if clauses else "", params
@@ -1,15 +1,82 @@
 """Text tokenization for semantic chunking."""
 
+import re
+from bisect import bisect_right
+from typing import Optional, Tuple
+
+_NEWLINE = re.compile('\n')
+
 
 class Tokenizer:
-    """Tokenizes text and provides context extraction."""
+    """Tokenizes text and provides context extraction.
+
+    Context windows take ``window_size`` characters on each side of a match
+    and are cut to ``max_length`` characters (no limit if None).
+    """
+
+    def __init__(self, window_size: int = 30, max_length: Optional[int] = 60):
+        self.window_size = window_size
+        self.max_length = max_length
 
-    def get_context_window(self, text: str, start: int, end: int, window_size: int = 30) -> str:
+    def get_context_window(self, text: str, start: int, end: int, window_size: Optional[int] = None) -> str:
         """Extract context window around a match."""
+        if window_size is None:
+            window_size = self.window_size
         context_start = max(0, start - window_size)
         context_end = min(len(text), end + window_size)
         context = text[context_start:context_end].strip()
         context = ' '.join(context.split())
-        if len(context) > 60:
-            context = context[:60] + "..."
+        if self.max_length is not None and len(context) > self.max_length:
+            context = context[:self.max_length] + "..."
         return context
+
+
+class LineIndex:
+    """Maps absolute offsets in a text to (line, column) and back.
+
+    Line starts are computed once, so each lookup is a bisect instead of
+    a search through the text. Lines are 1-based, columns 0-based.
+
+    The text may be a window into a larger document: ``first_line`` and
+    ``first_column`` give the position of its first character, and
+    ``base_offset`` its absolute offset. Offsets passed to and returned
+    by the index are relative to the indexed text; lines and columns are
+    those of the whole document.
+    """
+
+    def __init__(self, text: str, base_offset: int = 0, first_line: int = 1, first_column: int = 0):
+        self.text_length = len(text)
+        self.base_offset = base_offset
+        self.first_line = first_line
+        self.first_column = first_column
+        self.line_starts = [0]
+        self.line_starts.extend(m.end() for m in _NEWLINE.finditer(text))
+
+    def __len__(self) -> int:
+        return len(self.line_starts)
+
+    def locate(self, offset: int) -> Tuple[int, int]:
+        """Return the (line, column) of an offset."""
+        line = bisect_right(self.line_starts, offset)
+        column = offset - self.line_starts[line - 1]
+        if line == 1:
+            column += self.first_column
+        return line + self.first_line - 1, column
+
+    def offset(self, line: int, column: int) -> int:
+        """Return the offset of a (line, column) position."""
+        local_line = line - self.first_line + 1
+        if local_line == 1:
+            column -= self.first_column
+        return self.line_starts[local_line - 1] + column
+
+    def line_start(self, line: int) -> int:
+        """Return the offset of the first character of a line."""
+        return self.line_starts[line - self.first_line]
+
+    def line_end(self, line: int) -> int:
+        """Return the offset just past the last character of a line."""
+        local_line = line - self.first_line + 1
+        if local_line < len(self.line_starts):
+            return self.line_starts[local_line] - 1
+        return self.text_length
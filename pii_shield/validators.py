@@ -1,22 +1,67 @@
 """Validation functions for PII patterns."""
 
 import re
+from typing import Dict, List, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Luhn value of each digit, as is and doubled
+_LUHN_VALUES = ((0, 1, 2, 3, 4, 5, 6, 7, 8, 9), (0, 2, 4, 6, 8, 1, 3, 5, 7, 9))
+# ASCII digits to their doubled Luhn value, as bytes
+_LUHN_DOUBLED = bytes.maketrans(b'0123456789', bytes(_LUHN_VALUES[1]))
+# IBAN letters to the two digits that stand for them in the checksum (A=10 ... Z=35)
+_IBAN_DIGITS = str.maketrans({c: str(ord(c.upper()) - ord('A') + 10)
+                              for c in 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'})
+# Candidates below which the batch validators check one at a time even with NumPy
+NUMPY_MIN_BATCH = 32
+# Characters of a card candidate checked as an array row; longer candidates are checked one at a time
+_CARD_ROW = 32
+# Separators stripped from card numbers, as _card_digits does: the dash and ASCII whitespace
+_CARD_SEPARATORS = '-' + ''.join(c for c in map(chr, range(128)) if c.isspace())
+# Longest IBAN
+_IBAN_ROW = 34
+
+
+def _byte_table(values: Dict[str, int], default: int) -> "np.ndarray":
+    """Build a lookup array from byte value to number, for indexing with a uint8 array."""
+    table = np.full(256, default, dtype=np.int8)
+    for char, value in values.items():
+        table[ord(char)] = value
+    return table
+
+
+if np is not None:
+    # Luhn value of each ASCII character, as is and doubled; -1 marks separators, -2 anything else
+    _LUHN_PLAIN_TABLE = _byte_table({**{c: -1 for c in _CARD_SEPARATORS},
+                                     **{str(d): d for d in range(10)}}, -2)
+    _LUHN_DOUBLED_TABLE = _byte_table({str(d): _LUHN_VALUES[1][d] for d in range(10)}, 0)
+    # Checksum value of each ASCII character of an IBAN, 36 where not allowed
+    _IBAN_VALUE_TABLE = _byte_table({**{str(d): d for d in range(10)},
+                                     **{c: ord(c.upper()) - ord('A') + 10
+                                        for c in 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'}}, 36)
+
+
+def _card_digits(card_number: str) -> str:
+    """Strip the dashes and whitespace a card number may be written with."""
+    return ''.join(card_number.replace('-', '').split())
 
 
 def luhn_check(card_number: str) -> bool:
     """Validate credit card number using Luhn algorithm."""
-    digits = re.sub(r'[-\s]', '', card_number)
+    digits = _card_digits(card_number)
     if not digits.isdigit() or len(digits) < 13 or len(digits) > 19:
         return False
 
-    total = 0
-    for i, digit in enumerate(digits[::-1]):
-        n = int(digit)
-        if i % 2 == 1:
-            n *= 2
-            if n > 9:
-                n -= 9
-        total += n
+    if digits.isascii():
+        # Digits in odd positions from the right count as they are, the others doubled
+        plain = digits[-1::-2].encode('ascii')
+        doubled = digits[-2::-2].encode('ascii').translate(_LUHN_DOUBLED)
+        total = sum(plain) - 48 * len(plain) + sum(doubled)
+    else:
+        total = sum(_LUHN_VALUES[i % 2][int(digit)] for i, digit in enumerate(digits[::-1]))
 
     return total % 10 == 0
 
@@ -58,18 +103,10 @@ def iban_checksum(iban: str) -> bool:
     if not iban[:2].isalpha() or not iban[2:4].isdigit():
         return False
 
-    rearranged = iban[4:] + iban[:4]
-    numeric = ''
-    for char in rearranged:
-        if char.isalpha():
-            numeric += str(ord(char.upper()) - ord('A') + 10)
-        else:
-            numeric += char
-
-    try:
-        return int(numeric) % 97 == 1
-    except ValueError:
+    numeric = (iban[4:] + iban[:4]).translate(_IBAN_DIGITS)
+    if not (numeric.isascii() and numeric.isdigit()):
         return False
+    return int(numeric) % 97 == 1
 
 
 def api_key_entropy_check(key: str) -> bool:
@@ -78,3 +115,72 @@ def api_key_entropy_check(key: str) -> bool:
         return False
     unique_chars = len(set(key))
     return unique_chars >= len(key) * 0.5
+
+
+def luhn_check_many(card_numbers: Sequence[str]) -> List[bool]:
+    """
+    Validate many card numbers at once, as luhn_check does each.
+
+    With NumPy installed, the candidates are right-aligned as rows of one
+    byte array and checked together: table lookups give each character's
+    Luhn value, and a running count of digits from the right tells which
+    ones are doubled. Without it, each number is checked in turn.
+    """
+    count = len(card_numbers)
+    if np is None or count < NUMPY_MIN_BATCH:
+        return [luhn_check(card) for card in card_numbers]
+
+    lengths = np.fromiter(map(len, card_numbers), dtype=np.int64, count=count)
+    width = int(min(lengths.max(), _CARD_ROW))
+    rows = ''.join([card[-width:].rjust(width) for card in card_numbers])
+    chars = np.frombuffer(rows.encode('ascii', 'replace'), dtype=np.uint8).reshape(count, width)
+    plain = _LUHN_PLAIN_TABLE[chars]
+    is_digit = plain >= 0
+    # 1 for the rightmost digit, 2 for the one before it, ...
+    rank = np.cumsum(is_digit[:, ::-1], axis=1, dtype=np.int8)[:, ::-1]
+    totals = np.where(rank % 2 == 0, _LUHN_DOUBLED_TABLE[chars], np.maximum(plain, 0)).sum(axis=1)
+    digits = is_digit.sum(axis=1)
+    valid = (totals % 10 == 0) & (digits >= 13) & (digits <= 19) & (plain != -2).all(axis=1)
+
+    results = valid.tolist()
+    # Rows that were cut short or hold non-ASCII characters do not stand for the whole candidate
+    ascii_rows = np.fromiter(map(str.isascii, card_numbers), dtype=bool, count=count)
+    for i in np.flatnonzero((lengths > _CARD_ROW) | ~ascii_rows).tolist():
+        results[i] = luhn_check(card_numbers[i])
+    return results
+
+
+def iban_checksum_many(ibans: Sequence[str]) -> List[bool]:
+    """
+    Validate many IBANs at once, as iban_checksum does each.
+
+    With NumPy installed, the candidates are left-aligned as rows of one
+    byte array, each character's checksum value is looked up, and the
+    numbers are reduced modulo 97 one character column at a time. The
+    country code and check digits are folded in last, as if moved to the
+    end. Without NumPy, each IBAN is checked in turn.
+    """
+    count = len(ibans)
+    if np is None or count < NUMPY_MIN_BATCH:
+        return [iban_checksum(iban) for iban in ibans]
+
+    lengths = np.fromiter(map(len, ibans), dtype=np.int64, count=count)
+    rows = ''.join([iban[:_IBAN_ROW].ljust(_IBAN_ROW) for iban in ibans])
+    # Non-ASCII characters become '?', which is not allowed, as iban_checksum rejects them
+    chars = np.frombuffer(rows.encode('ascii', 'replace'), dtype=np.uint8).reshape(count, _IBAN_ROW)
+    values = _IBAN_VALUE_TABLE[chars]
+    inside = np.arange(_IBAN_ROW) < lengths[:, None]
+    valid = ((lengths >= 15) & (lengths <= _IBAN_ROW) & ((values < 36) | ~inside).all(axis=1)
+             & (values[:, :2] >= 10).all(axis=1) & (values[:, 2:4] < 10).all(axis=1))
+
+    # Letters stand for two digits; characters past the end leave the remainder as it is
+    # Columns are laid out contiguously, and every step stays well within int32
+    scales = np.where(inside, np.where(values >= 10, 100, 10), 1).astype(np.int32).T.copy()
+    values = np.where(inside, values, 0).astype(np.int32).T.copy()
+    remainders = np.zeros(count, dtype=np.int32)
+    for column in range(4, _IBAN_ROW):
+        remainders = (remainders * scales[column] + values[column]) % 97
+    # Two letters and two digits make six digits
+    head = (values[0] * 100 + values[1]) * 100 + values[2] * 10 + values[3]
+    remainders = (remainders * 1000000 + head) % 97
+    return (valid & (remainders == 1)).tolist()
@@ -0,0 +1,145 @@
+"""Persistent vault of reversible tokens for TOKEN masking."""
+
+import hashlib
+import os
+import re
+import secrets
+import sqlite3
+from typing import Dict, List, Optional, Tuple
+
+# Hex characters of the digest in each token
+TOKEN_DIGEST_LENGTH = 20
+# New tokens written to the database together
+_FLUSH_EVERY = 1000
+# Tokens looked up per query by detokenize
+_LOOKUP_BATCH = 500
+# Tokens as written by TokenVault.token, e.g. TOKEN_EMAIL_0123456789abcdef0123
+TOKEN_PATTERN = re.compile(r'TOKEN_([A-Z0-9_]+?)_([0-9a-f]{%d})\b' % TOKEN_DIGEST_LENGTH)
+
+
+class TokenVault:
+    """
+    Maps PII values to stable tokens and back.
+
+    A token is a keyed BLAKE2b digest of the value and its type, so the
+    same (type, value) always gets the same token, in every file and
+    every process that uses the vault, without asking anyone which token
+    to use. The key is generated when the vault is created and stored in
+    it; whoever holds the vault file can reverse its tokens.
+
+    Lookups are served from in-memory dicts. New tokens are written to the
+    SQLite database in batches of _FLUSH_EVERY (and on ``flush``), with
+    INSERT OR IGNORE, so worker processes sharing one vault file can add
+    tokens concurrently: they agree on every token they both produce.
+    Without a path, the vault lives in memory only and its key is random.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        if path is not None:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path or ':memory:', timeout=60)
+        if path is not None:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS tokens (
+                token TEXT PRIMARY KEY,
+                type TEXT NOT NULL,
+                value TEXT NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value BLOB NOT NULL)")
+        # Whichever process creates the vault first decides its key
+        self._conn.execute("INSERT OR IGNORE INTO meta VALUES ('key', ?)", (secrets.token_bytes(32),))
+        self._conn.commit()
+        self._key = bytes(self._conn.execute("SELECT value FROM meta WHERE name = 'key'").fetchone()[0])
+
+        self._tokens: Dict[Tuple[str, str], str] = {}
+        self._values: Dict[str, Tuple[str, str]] = {}
+        self._pending: List[Tuple[str, str, str]] = []
+
+    def __enter__(self) -> "TokenVault":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def token(self, pii_type: str, value: str) -> str:
+        """Return the token for a value, adding it to the vault if it is new."""
+        key = (pii_type, value)
+        token = self._tokens.get(key)
+        if token is None:
+            data = f"{pii_type}\0{value}".encode('utf-8', 'surrogateescape')
+            digest = hashlib.blake2b(data, key=self._key, digest_size=TOKEN_DIGEST_LENGTH // 2).hexdigest()
+            token = f"TOKEN_{pii_type}_{digest}"
+            self._tokens[key] = token
+            self._values[token] = key
+            self._pending.append((token, pii_type, value))
+            if len(self._pending) >= _FLUSH_EVERY:
+                self.flush()
+        return token
+
+    def lookup(self, token: str) -> Optional[Tuple[str, str]]:
+        """Return the (type, value) a token stands for, or None if it is unknown."""
+        found = self._values.get(token)
+        if found is None:
+            self._load([token])
+            found = self._values.get(token)
+        return found
+
+    def detokenize(self, text: str) -> str:
+        """Replace every known token in a text with the value it stands for."""
+        tokens = {m.group(0) for m in TOKEN_PATTERN.finditer(text)}
+        self._load([token for token in tokens if token not in self._values])
+
+        def restore(m: re.Match) -> str:
+            found = self._values.get(m.group(0))
+            return found[1] if found is not None else m.group(0)
+
+        return TOKEN_PATTERN.sub(restore, text)
+
+    def _load(self, tokens: List[str]) -> None:
+        """Read tokens written by other processes into memory."""
+        if self.path is None:
+            return
+        for i in range(0, len(tokens), _LOOKUP_BATCH):
+            batch = tokens[i:i + _LOOKUP_BATCH]
+            rows = self._conn.execute(
+                f"SELECT token, type, value FROM tokens WHERE token IN ({','.join('?' * len(batch))})", batch
+            )
+            for token, pii_type, value in rows:
+                self._values[token] = (pii_type, value)
+                self._tokens[(pii_type, value)] = token
+
+    def flush(self) -> None:
+        """Write new tokens to the database."""
+        if self._pending:
+            self._conn.executemany("INSERT OR IGNORE INTO tokens VALUES (?, ?, ?)", self._pending)
+            self._conn.commit()
+            self._pending = []
+
+    def close(self) -> None:
+        """Flush new tokens and close the database."""
+        self.flush()
+        self._conn.close()
+
+
+# Vaults opened by path, shared by every Masker using them, keyed by process id and path
+_shared_vaults: Dict[Tuple[int, str], TokenVault] = {}
+
+
+def shared_vault(path: str) -> TokenVault:
+    """
+    Return this process's TokenVault for a path, opening it on first use.
+
+    Vaults are keyed by process id as well as path. A worker forked from a
+    process that had the vault open inherits its dict, but SQLite
+    connections must not be used across fork(), so the worker opens its
+    own connection instead.
+    """
+    key = (os.getpid(), os.path.abspath(path))
+    vault = _shared_vaults.get(key)
+    if vault is None:
+        vault = _shared_vaults[key] = TokenVault(path)
+    return vault
@@ -0,0 +1,215 @@
+"""Directory walking with ignored directories pruned before they are entered."""
+
+import os
+import re
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+# Directories never descended into, matched by name
+DEFAULT_IGNORED_DIRS = frozenset({'.git', '__pycache__', 'node_modules', '.pytest_cache', 'venv', 'dist', 'build'})
+# Name of the per-directory ignore files honored with ``gitignore``
+GITIGNORE = '.gitignore'
+
+
+class _Rule:
+    """One compiled ignore pattern, in the syntax of .gitignore files."""
+
+    __slots__ = ("regex", "negate", "dir_only", "anchored")
+
+    def __init__(self, regex: "re.Pattern[str]", negate: bool, dir_only: bool, anchored: bool):
+        self.regex = regex
+        self.negate = negate
+        self.dir_only = dir_only
+        self.anchored = anchored
+
+
+def _translate(glob: str) -> str:
+    """Translate the wildcards of an ignore pattern into a regex."""
+    parts = []
+    i, n = 0, len(glob)
+    while i < n:
+        if glob.startswith('**/', i) and (i == 0 or glob[i - 1] == '/'):
+            parts.append('(?:.*/)?')
+            i += 3
+        elif glob.startswith('**', i) and i + 2 == n and (i == 0 or glob[i - 1] == '/'):
+            parts.append('.*')
+            i += 2
+        elif glob[i] == '*':
+            parts.append('[^/]*')
+            i += 1
+        elif glob[i] == '?':
+            parts.append('[^/]')
+            i += 1
+        elif glob[i] == '[':
+            close = glob.find(']', i + 2)
+            if close == -1:
+                parts.append(re.escape('['))
+                i += 1
+                continue
+            body = glob[i + 1:close]
+            if body[0] in '!^':
+                body = '^' + body[1:]
+            parts.append('[' + body.replace('\\', '\\\\') + ']')
+            i = close + 1
+        elif glob[i] == '\\' and i + 1 < n:
+            parts.append(re.escape(glob[i + 1]))
+            i += 2
+        else:
+            parts.append(re.escape(glob[i]))
+            i += 1
+    return ''.join(parts)
+
+
+def parse_patterns(lines: Sequence[str]) -> List[_Rule]:
+    """
+    Compile ignore patterns written as in a .gitignore file.
+
+    Blank lines and ``#`` comments are skipped, ``!`` re-includes what an
+    earlier pattern excluded, a trailing ``/`` matches directories only,
+    and a pattern containing ``/`` is matched against the whole path
+    relative to the ignore file's directory instead of against names.
+    """
+    rules = []
+    for line in lines:
+        line = line.rstrip('\n').rstrip('\r')
+        # Trailing spaces are ignored unless escaped
+        stripped = line.rstrip(' ')
+        if stripped.endswith('\\') and len(stripped) < len(line):
+            stripped += ' '
+        line = stripped
+        if not line or line.startswith('#'):
+            continue
+        negate = line.startswith('!')
+        if negate:
+            line = line[1:]
+        elif line.startswith(('\\!', '\\#')):
+            line = line[1:]
+        dir_only = line.endswith('/')
+        line = line.rstrip('/')
+        if not line:
+            continue
+        anchored = '/' in line
+        regex = re.compile(_translate(line.lstrip('/')) + '$', re.DOTALL)
+        rules.append(_Rule(regex, negate, dir_only, anchored))
+    return rules
+
+
+def _read_patterns(path: str) -> List[_Rule]:
+    """Compile the patterns of an ignore file, or none if it cannot be read."""
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            return parse_patterns(f.readlines())
+    except OSError:
+        return []
+
+
+class _RuleSet:
+    """Rules of one ignore file, with how to turn walk paths into paths relative to it."""
+
+    __slots__ = ("rules", "strip", "prefix")
+
+    def __init__(self, rules: List[_Rule], strip: int, prefix: str):
+        self.rules = rules
+        # Characters dropped from the front of a walk-relative path, and what replaces them
+        self.strip = strip
+        self.prefix = prefix
+
+
+def _ignored(rule_sets: List[_RuleSet], rel: str, name: str, is_dir: bool) -> bool:
+    """Return whether a walk-relative path is ignored; the last matching rule decides."""
+    ignored = False
+    for rule_set in rule_sets:
+        path = rule_set.prefix + rel[rule_set.strip:]
+        for rule in rule_set.rules:
+            if rule.dir_only and not is_dir:
+                continue
+            if rule.regex.match(path if rule.anchored else name):
+                ignored = not rule.negate
+    return ignored
+
+
+def _ancestor_rules(root: str) -> List[_RuleSet]:
+    """Collect the ignore rules that git would apply to ``root`` from above it."""
+    top = os.path.abspath(root)
+    while not os.path.exists(os.path.join(top, '.git')):
+        parent = os.path.dirname(top)
+        if parent == top:
+            return []
+        top = parent
+
+    rule_sets = []
+    exclude = _read_patterns(os.path.join(top, '.git', 'info', 'exclude'))
+    directory = top
+    relative = os.path.relpath(os.path.abspath(root), top).replace(os.sep, '/')
+    parts = [] if relative == '.' else relative.split('/')
+    for depth in range(len(parts) + 1):
+        rules = _read_patterns(os.path.join(directory, GITIGNORE)) if depth < len(parts) else []
+        if depth == 0:
+            rules = exclude + rules
+        if rules:
+            # Paths below root are matched as seen from this directory
+            prefix = ''.join(part + '/' for part in parts[depth:])
+            rule_sets.append(_RuleSet(rules, 0, prefix))
+        if depth < len(parts):
+            directory = os.path.join(directory, parts[depth])
+    return rule_sets
+
+
+def walk_files(root: str, ignore: Sequence[str] = (), gitignore: bool = False,
+               ignored_dirs: Optional[Sequence[str]] = None) -> Iterator[str]:
+    """
+    Yield the files under a directory, without entering ignored directories.
+
+    The tree is walked with ``os.scandir``, whose entries carry their type,
+    so listing a directory costs no ``stat`` per file. Ignored directories
+    are pruned before they are entered. Symbolic links to files are
+    listed; links to directories are not followed.
+
+    Args:
+        root: Directory to walk
+        ignore: Extra ignore patterns in .gitignore syntax, relative to ``root``
+        gitignore: Also honor .gitignore files (in the tree and above it, up
+            to the repository root) and the repository's info/exclude
+        ignored_dirs: Names of directories never entered (default: DEFAULT_IGNORED_DIRS)
+
+    Yields:
+        Paths of files, as ``root`` joined with their relative path, in
+        no particular order
+    """
+    ignored_dirs = DEFAULT_IGNORED_DIRS if ignored_dirs is None else frozenset(ignored_dirs)
+    base_sets: List[_RuleSet] = []
+    if gitignore:
+        base_sets.extend(_ancestor_rules(root))
+    if ignore:
+        base_sets.append(_RuleSet(parse_patterns(ignore), 0, ''))
+
+    # (directory, its path relative to root, rules in force there)
+    stack: List[Tuple[str, str, List[_RuleSet]]] = [(root, '', base_sets)]
+    while stack:
+        directory, rel_dir, rule_sets = stack.pop()
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue
+        if gitignore and any(entry.name == GITIGNORE for entry in entries):
+            rules = _read_patterns(os.path.join(directory, GITIGNORE))
+            if rules:
+                rule_sets = rule_sets + [_RuleSet(rules, len(rel_dir), '')]
+        for entry in entries:
+            rel = rel_dir + entry.name
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            if is_dir:
+                if entry.name in ignored_dirs:
+                    continue
+                if rule_sets and _ignored(rule_sets, rel, entry.name, True):
+                    continue
+                stack.append((entry.path, rel + '/', rule_sets))
+            else:
+                try:
+                    is_file = entry.is_file()
+                except OSError:
+                    continue
+                if is_file and not (rule_sets and _ignored(rule_sets, rel, entry.name, False)):
+                    yield entry.path
@@ -4,6 +4,12 @@ import pytest
 from pii_shield.scanner import Scanner
 
 
+@pytest.fixture(autouse=True)
+def _isolated_cache(tmp_path_factory, monkeypatch):
+    """Keep any default scan cache out of the real ~/.cache."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path_factory.mktemp("xdg-cache")))
+
+
 @pytest.fixture
 def scanner():
     """Create a Scanner instance."""
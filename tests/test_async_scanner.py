@@ -0,0 +1,132 @@
+"""Tests for the asyncio scanner."""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pii_shield import async_scanner
+from pii_shield.async_scanner import AsyncScanner
+from pii_shield.scanner import Scanner
+
+
+def _summary(result):
+    return [(m.type, m.value, m.line, m.column) for m in result.matches]
+
+
+def test_async_scan_text_inline():
+    """Test that small texts are scanned and match the sync scanner."""
+    text = "Contact: test@example.com"
+    result = asyncio.run(AsyncScanner().scan_text(text, "msg"))
+    assert _summary(result) == _summary(Scanner().scan_text(text, "msg"))
+    assert result.file == "msg"
+
+
+def test_async_scan_text_executor():
+    """Test that large texts scanned in the executor match the sync scanner."""
+    text = "filler line\n" * 30000 + "SSN: 123-45-6789\nmail test@example.com\n"
+    scanner = AsyncScanner(inline_threshold=0)
+    result = asyncio.run(scanner.scan_text(text))
+    assert _summary(result) == _summary(Scanner().scan_text(text))
+    assert result.summary == Scanner().scan_text(text).summary
+
+
+def test_async_scan_file_and_directory(tmp_path):
+    """Test file and directory scans."""
+    (tmp_path / "a.txt").write_text("Contact: test@example.com\n")
+    (tmp_path / "b.txt").write_text("nothing here\n")
+
+    async def run():
+        scanner = AsyncScanner(max_concurrency=2)
+        return await scanner.scan_file(str(tmp_path / "a.txt")), await scanner.scan_directory(str(tmp_path))
+
+    file_result, dir_results = asyncio.run(run())
+    assert any(m.type == "EMAIL" for m in file_result.matches)
+    assert [r.file for r in dir_results] == [str(tmp_path / "a.txt")]
+
+
+def test_async_concurrency_limit(monkeypatch):
+    """Test that no more than max_concurrency scans run at once."""
+    running = []
+    peak = []
+    lock = threading.Lock()
+    original = async_scanner._scan_text
+
+    def tracked(*args, **kwargs):
+        with lock:
+            running.append(1)
+            peak.append(len(running))
+        try:
+            return original(*args, **kwargs)
+        finally:
+            with lock:
+                running.pop()
+
+    monkeypatch.setattr(async_scanner, "_scan_text", tracked)
+
+    async def run():
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            scanner = AsyncScanner(executor=executor, max_concurrency=2, inline_threshold=0)
+            return await asyncio.gather(*(scanner.scan_text("test@example.com " * 2000) for _ in range(8)))
+
+    results = asyncio.run(run())
+    assert len(results) == 8
+    assert max(peak) <= 2
+
+
+def test_async_cancellation_stops_scan():
+    """Test that cancelling a scan stops the work in the executor thread."""
+    text = "filler 123-45-6789 line\n" * 200000
+    started = threading.Event()
+    chunks = []
+
+    class Slow(Scanner):
+        def scan_stream(self, fileobj, chunk_size):
+            started.set()
+            for match in super().scan_stream(_Counting(fileobj), chunk_size):
+                yield match
+
+    class _Counting:
+        def __init__(self, fileobj):
+            self.fileobj = fileobj
+
+        def read(self, size):
+            chunks.append(size)
+            return self.fileobj.read(size)
+
+    async def run():
+        scanner = AsyncScanner(scanner=Slow(), inline_threshold=0)
+        task = asyncio.ensure_future(scanner.scan_text(text))
+        while not started.is_set():
+            await asyncio.sleep(0.001)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0.2)
+
+    asyncio.run(run())
+    assert len(chunks) < len(text) // async_scanner.CANCEL_CHECK_SIZE
+
+
+def test_async_invalid_concurrency():
+    """Test that a concurrency limit below one is rejected."""
+    with pytest.raises(ValueError):
+        AsyncScanner(max_concurrency=0)
+
+
+def test_async_scan_errors_propagate(tmp_path, monkeypatch):
+    """Test that scan errors are raised instead of reported as no matches."""
+    (tmp_path / "a.txt").write_text("SSN: 123-45-6789\n")
+    scanner = AsyncScanner()
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(scanner.scan_file(str(tmp_path / "missing.txt")))
+
+    def broken(*args, **kwargs):
+        raise ValueError("decoder bug")
+
+    monkeypatch.setattr(scanner.scanner, "scan_stream", broken)
+    with pytest.raises(ValueError):
+        asyncio.run(scanner.scan_file(str(tmp_path / "a.txt")))
+    with pytest.raises(ValueError):
+        asyncio.run(scanner.scan_directory(str(tmp_path)))
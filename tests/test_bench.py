@@ -0,0 +1,69 @@
+"""Tests for the benchmark suite."""
+
+import copy
+
+import pytest
+from click.testing import CliRunner
+
+from pii_shield.bench import CORPORA, STAGES, generate_corpus, run_benchmark, compare, save_results, load_results
+from pii_shield.cli import cli
+
+
+def test_generate_corpus_deterministic():
+    """Test that corpora depend only on kind, size and seed."""
+    for kind in CORPORA:
+        text = generate_corpus(kind, 2000, seed=1)
+        assert len(text) >= 2000
+        assert text == generate_corpus(kind, 2000, seed=1)
+        assert text != generate_corpus(kind, 2000, seed=2)
+
+
+def test_generate_corpus_unknown():
+    """Test that unknown corpus kinds are rejected."""
+    with pytest.raises(ValueError):
+        generate_corpus("poetry", 100)
+
+
+def test_run_benchmark_results(tmp_path):
+    """Test the shape of benchmark results and their JSON round trip."""
+    results = run_benchmark(size=5000, corpora=["csv", "logs"], repeat=1)
+    assert list(results["corpora"]) == ["csv", "logs"]
+    csv = results["corpora"]["csv"]
+    assert csv["matches"] > 0
+    assert csv["mb_per_s"] > 0
+    assert set(csv["stages"]) == set(STAGES)
+    assert csv["peak_memory"] > 0
+
+    path = tmp_path / "bench.json"
+    save_results(results, str(path))
+    assert load_results(str(path)) == results
+
+
+def test_compare_reports_regressions():
+    """Test that slowdowns, memory growth and detection changes are reported."""
+    baseline = run_benchmark(size=3000, corpora=["dense"], repeat=1)
+    assert compare(baseline, baseline) == []
+
+    current = copy.deepcopy(baseline)
+    current["corpora"]["dense"]["mb_per_s"] *= 0.5
+    current["corpora"]["dense"]["peak_memory"] *= 2
+    current["corpora"]["dense"]["matches"] += 1
+    problems = compare(current, baseline)
+    assert len(problems) == 3
+
+    current["seed"] = 1
+    assert len(compare(current, baseline)) == 1
+
+
+def test_cli_bench(tmp_path):
+    """Test the bench command writes results and passes against itself."""
+    runner = CliRunner()
+    path = tmp_path / "baseline.json"
+    args = ['bench', '--size', '0.002', '--corpus', 'jsonl', '--repeat', '1']
+    result = runner.invoke(cli, args + ['-o', str(path)])
+    assert result.exit_code == 0
+    assert 'jsonl' in result.output
+    assert path.exists()
+
+    result = runner.invoke(cli, args + ['--baseline', str(path), '--tolerance', '100'])
+    assert result.exit_code == 0
@@ -0,0 +1,112 @@
+"""Tests for the persistent scan cache."""
+
+import os
+import stat
+
+import pytest
+
+from pii_shield.cache import ScanCache
+from pii_shield.scanner import Scanner
+
+
+def _make_tree(root):
+    """Create a small directory with and without PII."""
+    root.mkdir()
+    (root / "a.txt").write_text("Contact: test@example.com\n")
+    (root / "b.txt").write_text("nothing to see here\n")
+    (root / "c.txt").write_text("SSN: 123-45-6789\n")
+    return root
+
+
+def _summary(results):
+    return [(r.file, [(m.type, m.value, m.line, m.column) for m in r.matches]) for r in results]
+
+
+def test_cache_matches_uncached_scan(tmp_path):
+    """Test that cached results equal a fresh scan."""
+    data = _make_tree(tmp_path / "data")
+    scanner = Scanner()
+    expected = _summary(scanner.scan_directory(str(data)))
+    with ScanCache(str(tmp_path / "cache")) as cache:
+        first = scanner.scan_directory(str(data), cache=cache)
+        second = scanner.scan_directory(str(data), cache=cache)
+        assert cache.hits == 3
+    assert _summary(first) == expected
+    assert _summary(second) == expected
+
+
+def test_cache_skips_unchanged_files(tmp_path, monkeypatch):
+    """Test that unchanged files are not scanned again."""
+    data = _make_tree(tmp_path / "data")
+    scanner = Scanner()
+    with ScanCache(str(tmp_path / "cache")) as cache:
+        scanner.scan_directory(str(data), cache=cache)
+
+        scanned = []
+        original = scanner._scan_candidate
+        monkeypatch.setattr(scanner, "_scan_candidate", lambda path: scanned.append(path) or original(path))
+        (data / "b.txt").write_text("now with 555-12-3456 in it\n")
+        results = scanner.scan_directory(str(data), cache=cache)
+
+    assert scanned == [str(data / "b.txt")]
+    assert [os.path.basename(r.file) for r in results] == ["a.txt", "b.txt", "c.txt"]
+
+
+def test_cache_skips_failed_scans(tmp_path, monkeypatch):
+    """Test that a file whose scan failed is not cached as clean."""
+    data = _make_tree(tmp_path / "data")
+    scanner = Scanner()
+    original = scanner._scan_open
+
+    def failing(f, path, compact):
+        raise MemoryError()
+
+    with ScanCache(str(tmp_path / "cache")) as cache:
+        monkeypatch.setattr(scanner, "_scan_open", failing)
+        assert scanner.scan_directory(str(data), cache=cache) == []
+        monkeypatch.setattr(scanner, "_scan_open", original)
+        results = scanner.scan_directory(str(data), cache=cache)
+        assert cache.hits == 0
+    assert _summary(results) == _summary(Scanner().scan_directory(str(data)))
+
+
+def test_cache_touched_file_same_content(tmp_path):
+    """Test that a new mtime with the same content is still a hit."""
+    data = _make_tree(tmp_path / "data")
+    scanner = Scanner()
+    with ScanCache(str(tmp_path / "cache")) as cache:
+        scanner.scan_directory(str(data), cache=cache)
+        stat = os.stat(data / "a.txt")
+        os.utime(data / "a.txt", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        scanner.scan_directory(str(data), cache=cache)
+        assert cache.misses == 3
+        assert cache.hits == 3
+
+
+def test_cache_keyed_by_fingerprint(tmp_path):
+    """Test that scanners with different settings do not share entries."""
+    data = _make_tree(tmp_path / "data")
+    with ScanCache(str(tmp_path / "cache")) as cache:
+        Scanner(threshold=70).scan_directory(str(data), cache=cache)
+        results = Scanner(threshold=70, enabled_patterns=["SSN"]).scan_directory(str(data), cache=cache)
+        assert cache.hits == 0
+    assert Scanner(threshold=70).fingerprint() != Scanner(threshold=90).fingerprint()
+    assert all(m.type == "SSN" for r in results for m in r.matches)
+
+
+def test_cache_eviction(tmp_path):
+    """Test that the cache stays within its size budget."""
+    data = _make_tree(tmp_path / "data")
+    with ScanCache(str(tmp_path / "cache"), max_bytes=400) as cache:
+        Scanner().scan_directory(str(data), cache=cache)
+        total = cache._conn.execute("SELECT SUM(nbytes) FROM entries").fetchone()[0]
+    assert total <= 400
+
+
+@pytest.mark.skipif(os.name != "posix", reason="POSIX permissions")
+def test_cache_is_private(tmp_path):
+    """Test that the cache directory and database are readable by their owner only."""
+    with ScanCache(str(tmp_path / "cache")):
+        pass
+    assert stat.S_IMODE(os.stat(tmp_path / "cache").st_mode) == 0o700
+    assert stat.S_IMODE(os.stat(tmp_path / "cache" / "scan-cache.db").st_mode) == 0o600
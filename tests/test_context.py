@@ -55,3 +55,28 @@ def test_context_analyzer_multiple_types():
     email_adj = analyzer.analyze_context(text, 26, 42, "EMAIL")
     assert isinstance(ssn_adj, (int, float))
     assert isinstance(email_adj, (int, float))
+
+
+def test_context_index_matches_analyzer():
+    """Test that indexed lookups score exactly like window analysis."""
+    analyzer = ContextAnalyzer()
+    text = ("SSN: 123-45-6789 email: a@b.com key=sk-abc call 555-1234 x_123-45-6789\n" * 40 +
+            "card_no.4111111111111111 Tel 555-1234   Social =  123-45-6789\n" * 40)
+    index = analyzer.index(text)
+    for start in range(0, len(text), 7):
+        for pii_type in ("SSN", "EMAIL", "PHONE", "CREDIT_CARD", "API_KEY_OPENAI", "IP_ADDRESS"):
+            end = min(len(text), start + 11)
+            assert analyzer.analyze_context(text, start, end, pii_type, index) == \
+                analyzer.analyze_context(text, start, end, pii_type)
+    assert index._built
+
+
+def test_context_index_unaligned_lowercase():
+    """Test text whose lowercase form changes length falls back to windows."""
+    analyzer = ContextAnalyzer()
+    text = "İ SSN: 123-45-6789 " * 50
+    index = analyzer.index(text)
+    for k in range(50):
+        start = k * 19 + 7
+        assert index.adjustment(start, start + 11, "SSN") == analyzer.analyze_context(text, start, start + 11, "SSN")
+    assert not index._built
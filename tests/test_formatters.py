@@ -0,0 +1,65 @@
+"""Tests for output formatters."""
+
+import csv
+import io
+import json
+
+import pytest
+
+from pii_shield.formatters import CSVFormatter, Formatter, JSONFormatter, NDJSONFormatter, TextFormatter
+from pii_shield.scanner import Scanner
+
+TEXT = 'SSN: 123-45-6789, "quoted", email: test@example.com\nphone: 415-555-0132'
+
+
+def _results():
+    scanner = Scanner()
+    return [scanner.scan_text(TEXT, 'a "b".txt'), scanner.scan_text("nothing", "c.txt")]
+
+
+def test_json_document():
+    """Test that JSON output parses and counts its findings."""
+    data = json.loads(JSONFormatter().format(_results()))
+    assert data["total_findings"] == len(data["findings"]) == 3
+    assert data["files_scanned"] == 2
+    assert data["summary"]["SSN"] == 1
+    assert json.loads(JSONFormatter().format([]))["findings"] == []
+
+
+def test_ndjson_records():
+    """Test that NDJSON has one finding per line and a trailing summary."""
+    lines = NDJSONFormatter().format(_results()).split("\n")
+    records = [json.loads(line) for line in lines]
+    assert all("file" in record for record in records[:-1])
+    assert records[-1] == {"files_scanned": 2, "total_findings": 3,
+                           "summary": {"SSN": 1, "EMAIL": 1, "PHONE": 1}}
+
+
+def test_csv_quoting():
+    """Test that CSV output round-trips through the csv module."""
+    rows = list(csv.reader(io.StringIO(CSVFormatter().format(_results()))))
+    assert rows[0] == ["file", "line", "column", "type", "confidence", "value", "context"]
+    assert len(rows) == 4
+    assert all(row[0] == 'a "b".txt' for row in rows[1:])
+    assert rows[1][5] == "123-45-6789"
+
+
+def test_write_streams_results():
+    """Test that write consumes results lazily and returns the finding count."""
+    out = io.StringIO()
+    seen = []
+
+    def results():
+        for result in _results():
+            yield result
+            seen.append(out.getvalue())
+
+    assert TextFormatter().write(results(), out) == 3
+    assert "123-45-6789" in seen[0]
+    assert out.getvalue().endswith("file(s)\n")
+
+
+def test_formatter_is_abstract():
+    """Test that Formatter subclasses must implement write."""
+    with pytest.raises(TypeError):
+        Formatter()
@@ -0,0 +1,114 @@
+"""Tests for scanning git changes."""
+
+import subprocess
+
+import pytest
+from click.testing import CliRunner
+
+from pii_shield.cli import cli
+from pii_shield.gitdiff import BlobReader, added_lines, scan_changes
+from pii_shield.scanner import Scanner
+from pii_shield.store import FindingsStore
+
+
+def _git(repo, *args):
+    subprocess.run(["git", "-C", str(repo), *args], check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """A repository with one commit holding a file with an old email address."""
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "config", "user.email", "dev@example.com")
+    _git(tmp_path, "config", "user.name", "dev")
+    (tmp_path / "users.txt").write_text("old@example.com\nplain\n")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-q", "-m", "init")
+    return tmp_path
+
+
+def test_added_lines(repo):
+    """Test that only the new side of each hunk is reported."""
+    (repo / "users.txt").write_text("old@example.com\nnew@example.com\nplain\n+++ b/x\n")
+    assert added_lines(str(repo)) == {"users.txt": [(2, 2), (4, 4)]}
+
+
+def test_staged_scans_only_added_lines(repo):
+    """Test that staged contents are scanned and old lines are not reported."""
+    (repo / "users.txt").write_text("old@example.com\nnew@example.com\nplain\n")
+    _git(repo, "add", "users.txt")
+    # Unstaged edits are not part of the staged scan
+    (repo / "users.txt").write_text("old@example.com\nnew@example.com\nplain\nlater@example.com\n")
+    results = list(scan_changes(Scanner(), str(repo), staged=True))
+    assert len(results) == 1
+    assert [(m.line, m.value) for m in results[0].matches] == [(2, "new@example.com")]
+
+
+def test_git_diff_range(repo):
+    """Test that a commit range is scanned at its end revision."""
+    (repo / "users.txt").write_text("old@example.com\nplain\nSSN: 123-45-6789\n")
+    _git(repo, "commit", "-q", "-am", "add ssn")
+    (repo / "users.txt").write_text("")
+    results = list(scan_changes(Scanner(), str(repo), ref="HEAD~1..HEAD"))
+    assert [(m.line, m.type) for m in results[0].matches] == [(3, "SSN")]
+
+
+@pytest.mark.parametrize("name", ["my file.txt", "tab\tname.txt", "two  spaces .txt"])
+def test_file_names_with_spaces(repo, name):
+    """Test that files whose names hold spaces or tabs are scanned, from the working tree and staged."""
+    (repo / name).write_text("plain\nSSN: 123-45-6789\n")
+    _git(repo, "add", name)
+    assert added_lines(str(repo), staged=True) == {name: [(1, 2)]}
+    staged = list(scan_changes(Scanner(), str(repo), staged=True))
+    assert [(m.line, m.type) for m in staged[0].matches] == [(2, "SSN")]
+
+    _git(repo, "commit", "-q", "-m", "add file")
+    (repo / name).write_text("plain\nSSN: 123-45-6789\nmail new@example.com\n")
+    working = list(scan_changes(Scanner(), str(repo), ref="HEAD"))
+    assert [(m.line, m.type) for m in working[0].matches] == [(3, "EMAIL")]
+
+
+def test_blob_reader_missing(repo):
+    """Test that unknown objects read as None without stopping the reader."""
+    with BlobReader(str(repo)) as reader:
+        assert reader.read("HEAD:nope.txt") is None
+        assert reader.read(":no such file.txt") is None
+        assert reader.read("HEAD:users.txt") == b"old@example.com\nplain\n"
+
+
+def test_staged_skips_unchanged_line_between_hunks(repo):
+    """Test that an unchanged line between two nearby hunks is not reported."""
+    (repo / "users.txt").write_text("x\nold ssn: 123-45-6789\ny\n")
+    _git(repo, "commit", "-q", "-am", "ssn")
+    (repo / "users.txt").write_text("x2\nold ssn: 123-45-6789\ny2\n")
+    _git(repo, "add", "users.txt")
+    results = list(scan_changes(Scanner(), str(repo), staged=True))
+    assert [list(r.matches) for r in results] == [[]]
+
+
+def test_cli_scan_staged(repo, monkeypatch):
+    """Test scan --staged from inside a repository."""
+    (repo / "users.txt").write_text("old@example.com\nplain\nnew@example.com\n")
+    _git(repo, "add", "users.txt")
+    monkeypatch.chdir(repo)
+    result = CliRunner().invoke(cli, ['scan', '--staged'])
+    assert result.exit_code == 1
+    assert 'new@example.com' in result.output
+    assert 'Summary: 1 PII instances' in result.output
+
+    result = CliRunner().invoke(cli, ['scan', '--git-diff', 'no-such-ref'])
+    assert result.exit_code == 1
+    assert 'Error' in result.output
+
+
+def test_cli_scan_staged_store_root(repo, tmp_path_factory, monkeypatch):
+    """Test that scan --staged --store records the repository as the scan root."""
+    (repo / "users.txt").write_text("old@example.com\nplain\nnew@example.com\n")
+    _git(repo, "add", "users.txt")
+    (repo / "sub").mkdir()
+    monkeypatch.chdir(repo / "sub")
+    db = str(tmp_path_factory.mktemp("store") / "findings.db")
+    result = CliRunner().invoke(cli, ['scan', '--staged', '--store', db])
+    assert result.exit_code == 1
+    with FindingsStore(db) as store:
+        assert [scan["root"] for scan in store.scans()] == [str(repo.resolve())]
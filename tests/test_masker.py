@@ -1,5 +1,6 @@
 """Minimal tests for masker."""
 
+import pytest
 from pii_shield.masker import Masker
 from pii_shield.models import MaskingStrategy
 
@@ -93,3 +94,93 @@ def test_masking_very_long_string():
     result = masker.mask(long_value, "EMAIL")
     assert isinstance(result, str)
     assert len(result) > 0
+
+
+def test_apply_masks_by_offset():
+    """Test that apply masks each match at its own offsets."""
+    from pii_shield.scanner import Scanner
+    text = "a@example.com b@example.com a@example.com"
+    matches = [m for m in Scanner().scan_text(text).matches if m.start > 0]
+    masked = Masker(strategy=MaskingStrategy.FULL).apply(text, matches)
+    assert masked == "a@example.com [EMAIL_REDACTED] [EMAIL_REDACTED]"
+
+
+def test_apply_overlapping_spans():
+    """Test that overlapping spans are masked once."""
+    from pii_shield.models import PIIMatch
+    text = "id 1234567893 end"
+    matches = [
+        PIIMatch(type="NPI", value="1234567893", confidence=60, line=1, column=3, context="", start=3, end=13),
+        PIIMatch(type="PHONE", value="1234567893", confidence=95, line=1, column=3, context="", start=3, end=13),
+        PIIMatch(type="ZIP_CODE", value="45678", confidence=55, line=1, column=6, context="", start=6, end=11),
+    ]
+    masked = Masker(strategy=MaskingStrategy.FULL).apply(text, matches)
+    assert masked == "id [PHONE_REDACTED] end"
+
+
+def test_apply_partially_overlapping_spans():
+    """Test that a span overlapping another is masked to its end."""
+    from pii_shield.models import PIIMatch
+    text = "pay 123-45-6789 23914111 1111 now"
+    matches = [
+        PIIMatch(type="SSN", value="123-45-6789", confidence=90, line=1, column=4, context="", start=4, end=15),
+        PIIMatch(type="CREDIT_CARD", value="6789 23914111 1111", confidence=80, line=1, column=11,
+                 context="", start=11, end=29),
+    ]
+    masked = Masker(strategy=MaskingStrategy.FULL).apply(text, matches)
+    assert masked == "pay [SSN_REDACTED] now"
+
+
+def test_apply_match_table():
+    """Test that apply accepts a MatchTable."""
+    from pii_shield.scanner import Scanner
+    text = "SSN: 123-45-6789\nemail: test@example.com\n"
+    scanner = Scanner()
+    masker = Masker(strategy=MaskingStrategy.PARTIAL)
+    expected = masker.apply(text, scanner.scan_text(text).matches)
+    assert masker.apply(text, scanner.scan_text(text, compact=True).matches) == expected
+    assert "123-45-6789" not in expected
+    assert scanner.mask_text(text, masker)[0] == expected
+
+
+def test_hash_masking_keyed():
+    """Test that keyed hashing depends on the key."""
+    plain = Masker(strategy=MaskingStrategy.HASH)
+    keyed = Masker(strategy=MaskingStrategy.HASH, hash_key="secret")
+    other = Masker(strategy=MaskingStrategy.HASH, hash_key="other")
+    value = "123-45-6789"
+    assert keyed.mask(value, "SSN") == keyed.mask(value, "SSN")
+    assert keyed.mask(value, "SSN") != plain.mask(value, "SSN")
+    assert keyed.mask(value, "SSN") != other.mask(value, "SSN")
+
+
+def test_hash_masking_algorithms_and_length():
+    """Test digest selection and length."""
+    for algorithm in ("blake2b", "blake2s", "sha256"):
+        masker = Masker(strategy=MaskingStrategy.HASH, hash_key=b"k", hash_algorithm=algorithm, hash_length=24)
+        assert len(masker.mask("test@example.com", "EMAIL")) == 24
+    with pytest.raises(ValueError):
+        Masker(strategy=MaskingStrategy.HASH, hash_algorithm="sha256", hash_length=65)
+    with pytest.raises(ValueError):
+        Masker(strategy=MaskingStrategy.HASH, hash_algorithm="md5")
+
+
+def test_hash_key_length_checked():
+    """Test that keys too long for the digest are rejected up front."""
+    with pytest.raises(ValueError, match="at most 64 bytes"):
+        Masker(strategy=MaskingStrategy.HASH, hash_key="k" * 65)
+    with pytest.raises(ValueError, match="at most 32 bytes"):
+        Masker(strategy=MaskingStrategy.HASH, hash_key="k" * 64, hash_algorithm="blake2s")
+    long_key = Masker(strategy=MaskingStrategy.HASH, hash_key="k" * 100, hash_algorithm="sha256")
+    assert len(long_key.mask("123-45-6789", "SSN")) == long_key.hash_length
+    # The key is unused by other strategies
+    Masker(strategy=MaskingStrategy.FULL, hash_key="k" * 100)
+
+
+def test_mask_many_matches_mask():
+    """Test that mask_many gives the same values as mask."""
+    values = ["a@example.com", "123-45-6789", "a@example.com"]
+    types = ["EMAIL", "SSN", "EMAIL"]
+    for strategy in (MaskingStrategy.FULL, MaskingStrategy.PARTIAL, MaskingStrategy.HASH):
+        masker = Masker(strategy=strategy, hash_key="k")
+        assert masker.mask_many(values, types) == [masker.mask(v, t) for v, t in zip(values, types)]
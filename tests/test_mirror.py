@@ -0,0 +1,44 @@
+"""Tests for masked copies of directory trees."""
+
+import json
+
+import pytest
+
+from pii_shield.mirror import MANIFEST_NAME, mask_directory
+from pii_shield.scanner import Scanner
+
+
+def test_mask_directory(tmp_path):
+    """Test that a directory is mirrored with PII masked."""
+    src = tmp_path / "src"
+    (src / "sub").mkdir(parents=True)
+    (src / "sub" / "pii.txt").write_text("SSN: 123-45-6789\n")
+    (src / "clean.txt").write_text("nothing here\n")
+    out = tmp_path / "out"
+    manifest = Scanner().mask_directory(str(src), str(out))
+    assert (out / "sub" / "pii.txt").read_text() == "SSN: [SSN_REDACTED]\n"
+    assert (out / "clean.txt").read_text() == "nothing here\n"
+    assert manifest["files"]["masked"] == 1
+    assert manifest["files"]["copied"] == 1
+    assert json.loads((out / MANIFEST_NAME).read_text()) == manifest
+
+
+def test_mask_directory_rejects_nested_output(tmp_path):
+    """Test that the output directory cannot be inside the input."""
+    with pytest.raises(ValueError):
+        Scanner().mask_directory(str(tmp_path), str(tmp_path / "out"))
+
+
+def test_mask_directory_workers(tmp_path):
+    """Test that worker processes mask and link the same files as a single process."""
+    src = tmp_path / "src"
+    src.mkdir()
+    for i in range(40):
+        (src / f"pii{i}.txt").write_text(f"user{i}@example.com\n")
+    (src / "clean.txt").write_text("nothing here\n")
+    out = tmp_path / "out"
+    manifest = mask_directory(Scanner(), str(src), str(out), workers=3, hardlink=True)
+    assert manifest["files"] == {"masked": 40, "copied": 1, "skipped": 0, "failed": 0}
+    assert (out / "pii7.txt").read_text() == "[EMAIL_REDACTED]\n"
+    assert (out / "clean.txt").stat().st_ino == (src / "clean.txt").stat().st_ino
+    assert not [p for p in out.iterdir() if p.name.endswith(".tmp")]
@@ -0,0 +1,67 @@
+"""Tests for data models."""
+
+import pickle
+
+import pytest
+
+from pii_shield.models import MatchTable, PIIMatch, ScanResult
+from pii_shield.formatters import TextFormatter, JSONFormatter, CSVFormatter
+from pii_shield.scanner import Scanner
+
+
+TEXT = "Contact: test@example.com\nSSN: 123-45-6789 and ssn: 123-45-6789\ncard 4111111111111111\n"
+
+
+def test_piimatch_slots_and_equality():
+    """Test that matches have no per-instance dict and compare by value."""
+    a = PIIMatch("EMAIL", "a@b.com", 90, 1, 0, "ctx", 0, 7)
+    b = PIIMatch("EMAIL", "a@b.com", 90, 1, 0, "ctx", 0, 7)
+    assert not hasattr(a, "__dict__")
+    assert a == b
+    b.confidence = 80
+    assert a != b
+    assert pickle.loads(pickle.dumps(a)) == a
+
+
+def test_match_table_rows_match_scan():
+    """Test that a compact scan yields the same rows as a list scan."""
+    scanner = Scanner()
+    expected = scanner.scan_text(TEXT, "t.txt")
+    result = scanner.scan_text(TEXT, "t.txt", compact=True)
+    assert isinstance(result.matches, MatchTable)
+    assert list(result.matches) == expected.matches
+    assert result.summary == expected.summary
+    assert result.matches[-1] == expected.matches[-1]
+    assert result.matches[:2] == expected.matches[:2]
+    with pytest.raises(IndexError):
+        result.matches[len(expected.matches)]
+
+
+def test_match_table_without_source():
+    """Test a table built from match objects."""
+    matches = Scanner().scan_text(TEXT).matches
+    table = MatchTable.from_matches(matches)
+    assert table.source is None
+    assert list(table) == matches
+    assert table.type_of(0) == matches[0].type
+
+
+def test_formatters_accept_match_table():
+    """Test that formatters produce the same output for tables and lists."""
+    scanner = Scanner()
+    listed = [scanner.scan_text(TEXT, "t.txt")]
+    compact = [scanner.scan_text(TEXT, "t.txt", compact=True)]
+    for formatter in (TextFormatter(), JSONFormatter(), CSVFormatter()):
+        assert formatter.format(compact) == formatter.format(listed)
+    assert ScanResult.from_dict(compact[0].to_dict()).matches == listed[0].matches
+
+
+def test_piimatch_lazy_context():
+    """Test that contexts are extracted on first access and then released."""
+    scanner = Scanner()
+    match = scanner.scan_text(TEXT).matches[0]
+    assert match._context is None
+    assert match.context == Scanner().tokenizer.get_context_window(TEXT, match.start, match.end)
+    assert match._source is None
+    restored = pickle.loads(pickle.dumps(scanner.scan_text(TEXT).matches[0]))
+    assert restored.context == match.context
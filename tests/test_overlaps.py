@@ -0,0 +1,99 @@
+"""Tests for overlap resolution."""
+
+import io
+import json
+import random
+
+from click.testing import CliRunner
+from pii_shield.cli import cli
+from pii_shield.models import PIIMatch
+from pii_shield.overlaps import resolve_overlaps
+from pii_shield.scanner import Scanner
+
+TEXT = "npi 1234567893 ssn 123-45-6789 dl A1234567\n"
+
+
+def _match(pii_type, start, end, confidence):
+    return PIIMatch(type=pii_type, value="x" * (end - start), confidence=confidence,
+                    line=1, column=start, context="", start=start, end=end)
+
+
+def test_resolve_keeps_highest_confidence():
+    """Test that the most confident of overlapping matches is kept."""
+    matches = [_match("NPI", 0, 10, 60), _match("PHONE", 0, 10, 95)]
+    kept = resolve_overlaps(matches, {})
+    assert [m.type for m in kept] == ["PHONE"]
+
+
+def test_resolve_precedence_breaks_ties():
+    """Test that precedence decides between equally confident matches."""
+    matches = [_match("NPI", 0, 10, 80), _match("PHONE", 0, 10, 80)]
+    assert resolve_overlaps(matches, {"NPI": 0, "PHONE": 1})[0].type == "NPI"
+    assert resolve_overlaps(matches, {"PHONE": 0, "NPI": 1})[0].type == "PHONE"
+
+
+def test_resolve_keeps_disjoint_neighbours():
+    """Test that matches sharing only an overlapping neighbour both survive."""
+    matches = [_match("A", 0, 5, 80), _match("B", 3, 9, 70), _match("C", 6, 12, 80)]
+    kept = resolve_overlaps(matches, {})
+    assert [m.type for m in kept] == ["A", "C"]
+
+
+def test_resolve_alternates():
+    """Test that suppressed matches are recorded only on request."""
+    matches = [_match("NPI", 0, 10, 60), _match("PHONE", 0, 10, 95)]
+    assert resolve_overlaps(matches, {})[0].alternates is None
+    kept = resolve_overlaps(matches, {}, keep_alternates=True)
+    assert [m.type for m in kept[0].alternates] == ["NPI"]
+
+
+def test_scanner_resolves_overlaps():
+    """Test that the scanner reports one match per span when resolving."""
+    plain = Scanner(threshold=0).scan_text(TEXT)
+    resolved = Scanner(threshold=0, resolve_overlaps=True).scan_text(TEXT)
+    assert len(resolved.matches) < len(plain.matches)
+    spans = [(m.start, m.end) for m in resolved.matches]
+    assert len(spans) == len(set(spans))
+    assert all(m.alternates is None for m in resolved.matches)
+
+
+def test_scanner_paths_agree():
+    """Test that every scan path resolves overlaps the same way."""
+    scanner = Scanner(threshold=0, resolve_overlaps=True)
+    expected = [m.to_dict() for m in scanner.scan_text(TEXT * 3).matches]
+    assert [m.to_dict() for m in scanner.scan_text(TEXT * 3, compact=True).matches] == expected
+    streamed = list(scanner.scan_stream(io.StringIO(TEXT * 3), chunk_size=50))
+    assert [m.to_dict() for m in streamed] == expected
+    batch = scanner.scan_texts([TEXT.strip()] * 3)
+    assert len(batch.matches) == len(expected)
+
+
+def test_scan_stream_resolves_across_cuts():
+    """Test that streaming resolves overlaps on lines cut mid-line as scan_text does."""
+    pieces = ["123-45-6789", "4111 1111 1111 1111", "6789 23914111 1111", "555-123-4567",
+              "DE89370400440532013000", "1234567890", "card", "phone", " ", "-"]
+    rng = random.Random(3)
+    text = "".join(rng.choice(pieces) for _ in range(1500)) + "\n" + "".join(rng.choice(pieces) for _ in range(900))
+    for resolve in (True, False):
+        scanner = Scanner(threshold=0, resolve_overlaps=resolve)
+        expected = [m.to_dict() for m in scanner.scan_text(text).matches]
+        for chunk_size in (29, 235, 1100, 3000):
+            streamed = scanner.scan_stream(io.StringIO(text), chunk_size=chunk_size)
+            assert [m.to_dict() for m in streamed] == expected
+
+
+def test_scanner_keep_alternates():
+    """Test that keep_alternates implies resolving and records the losers."""
+    result = Scanner(threshold=0, keep_alternates=True).scan_text(TEXT)
+    npi = next(m for m in result.matches if m.value == "1234567893")
+    assert npi.alternates
+    assert all(alt.value == npi.value for alt in npi.alternates)
+
+
+def test_cli_alternates_json():
+    """Test that JSON output lists alternates."""
+    runner = CliRunner()
+    result = runner.invoke(cli, ['scan', '--stdin', '--format', 'json', '--threshold', '0', '--alternates'],
+                           input=TEXT)
+    findings = json.loads(result.output)["findings"]
+    assert any("alternates" in f for f in findings)
@@ -0,0 +1,47 @@
+"""Tests for the HTML report."""
+
+from pii_shield.report import export_html, generate_html
+from pii_shield.scanner import Scanner
+
+
+def _results():
+    scanner = Scanner()
+    return [
+        scanner.scan_text("alice@example.com\nbob@example.com\ncarol@example.com", "<a>.txt"),
+        scanner.scan_text("nothing here", "b.txt"),
+        scanner.scan_text("SSN: 123-45-6789", "c.txt"),
+    ]
+
+
+def test_generate_html_single_page():
+    """Test that the single-page report lists every finding, escaped."""
+    html = generate_html(_results())
+    assert html.count("<tr>") == 5
+    assert "&lt;a&gt;.txt" in html
+    assert "<a>.txt" not in html
+
+
+def test_export_html_paginates(tmp_path):
+    """Test that findings are split into linked per-file pages."""
+    index = tmp_path / "report.html"
+    assert export_html(iter(_results()), str(index), page_size=2) == str(index)
+    text = index.read_text()
+    assert ">3</div>" in text  # files scanned
+    assert ">4</div>" in text  # total findings
+    assert 'href="report_files/file-00001.html"' in text
+    assert 'href="report_files/file-00002.html"' in text
+
+    pages = sorted(p.name for p in (tmp_path / "report_files").iterdir())
+    assert pages == ["file-00001-2.html", "file-00001.html", "file-00002.html"]
+    first = (tmp_path / "report_files" / "file-00001.html").read_text()
+    assert "Page 1 of 2" in first and 'href="file-00001-2.html"' in first
+    assert 'href="../report.html"' in first
+
+
+def test_export_html_removes_stale_pages(tmp_path):
+    """Test that pages left by a larger earlier report are removed."""
+    index = str(tmp_path / "report.html")
+    export_html(_results(), index, page_size=1)
+    export_html(_results()[1:], index)
+    pages = sorted(p.name for p in (tmp_path / "report_files").iterdir())
+    assert pages == ["file-00001.html"]
@@ -128,3 +128,238 @@ def test_scan_column_position():
     if result.matches:
         assert all(m.column >= 0 for m in result.matches)
         assert all(m.line > 0 for m in result.matches)
+
+
+def test_scan_enabled_patterns():
+    """Test scanner only reports enabled pattern types."""
+    scanner = Scanner(enabled_patterns=["SSN"])
+    result = scanner.scan_text("SSN: 123-45-6789 email: test@example.com", "test.txt")
+    assert {m.type for m in result.matches} == {"SSN"}
+
+
+def test_scan_unknown_enabled_pattern():
+    """Test unknown pattern types are rejected."""
+    with pytest.raises(ValueError):
+        Scanner(enabled_patterns=["NOT_A_TYPE"])
+
+
+def test_scan_scores_each_occurrence_in_place():
+    """Test repeated values are scored by their own context."""
+    scanner = Scanner(threshold=0)
+    text = "order 666-45-6789 shipped" + " " * 60 + "\nSSN: 666-45-6789"
+    result = scanner.scan_text(text, "test.txt")
+    ssn = [m for m in result.matches if m.type == "SSN"]
+    assert len(ssn) == 2
+    assert ssn[1].confidence > ssn[0].confidence
+
+
+def test_scan_match_offsets():
+    """Test matches carry their absolute offsets."""
+    scanner = Scanner()
+    text = "line one\nmail test@example.com"
+    result = scanner.scan_text(text, "test.txt")
+    match = next(m for m in result.matches if m.type == "EMAIL")
+    assert text[match.start:match.end] == match.value
+    assert (match.line, match.column) == (2, 5)
+
+
+def test_scan_stream_matches_scan_text():
+    """Test streaming scan finds the same matches as a whole-text scan."""
+    import io
+    scanner = Scanner(threshold=60)
+    text = "\n".join(f"row {i}: user{i}@example.com SSN 123-45-67{i % 90 + 10}" for i in range(300))
+    expected = [(m.type, m.value, m.line, m.column, m.confidence) for m in scanner.scan_text(text).matches]
+    streamed = [(m.type, m.value, m.line, m.column, m.confidence)
+                for m in scanner.scan_stream(io.StringIO(text), chunk_size=500)]
+    assert streamed == expected
+
+
+def test_scan_stream_long_line():
+    """Test streaming scan of a line longer than the chunk size."""
+    import io
+    scanner = Scanner()
+    text = "x " * 5000 + "test@example.com" + " y" * 5000
+    matches = list(scanner.scan_stream(io.StringIO(text), chunk_size=256))
+    assert [m.value for m in matches] == ["test@example.com"]
+    assert matches[0].line == 1
+    assert matches[0].column == 10000
+
+
+def test_scan_file_streams_large_files(tmp_path):
+    """Test scan_file streams files above the stream threshold."""
+    path = tmp_path / "big.txt"
+    path.write_text("filler line\n" * 100 + "Contact: test@example.com\n")
+    scanner = Scanner(stream_threshold=100)
+    result = scanner.scan_file(str(path))
+    assert len(result.matches) == 1
+    assert result.matches[0].line == 101
+    assert result.summary == {"EMAIL": 1}
+
+
+def _make_tree(root):
+    """Create a small directory tree with PII in some files."""
+    (root / "sub").mkdir()
+    for i in range(20):
+        folder = root / "sub" if i % 2 else root
+        content = f"user{i}@example.com\n" if i % 3 else "nothing here\n"
+        (folder / f"file{i:02d}.txt").write_text(content)
+
+
+def test_scan_directory_parallel_ordered(tmp_path):
+    """Test parallel directory scan matches a serial scan in path order."""
+    _make_tree(tmp_path)
+    scanner = Scanner()
+    serial = scanner.scan_directory(str(tmp_path))
+    parallel = scanner.scan_directory(str(tmp_path), workers=2)
+    assert [r.file for r in parallel] == [r.file for r in serial]
+    assert [r.file for r in serial] == sorted(r.file for r in serial)
+    assert len(serial) == 13
+
+
+def test_scan_directory_parallel_unordered(tmp_path):
+    """Test unordered parallel directory scan returns every result."""
+    _make_tree(tmp_path)
+    scanner = Scanner()
+    serial = scanner.scan_directory(str(tmp_path))
+    unordered = scanner.scan_directory(str(tmp_path), workers=2, ordered=False)
+    assert sorted(r.file for r in unordered) == [r.file for r in serial]
+
+
+def test_scan_mmap_matches_scan_text(tmp_path):
+    """Test mmap scanning gives the same matches as text scanning."""
+    text = "id,email,ssn\n" + "\n".join(f"{i},user{i}@example.com,123-45-67{i % 90 + 10}" for i in range(200))
+    path = tmp_path / "export.csv"
+    path.write_text(text)
+    scanner = Scanner(threshold=60)
+    expected = [(m.type, m.value, m.line, m.column, m.confidence, m.context)
+                for m in scanner.scan_text(text).matches]
+    mapped = [(m.type, m.value, m.line, m.column, m.confidence, m.context)
+              for m in scanner.scan_mmap(str(path)).matches]
+    assert mapped == expected
+
+
+def test_scan_mmap_non_ascii_columns(tmp_path):
+    """Test mmap scanning reports character columns on non-ASCII lines."""
+    path = tmp_path / "notes.txt"
+    path.write_text("café ☕ contact: test@example.com", encoding="utf-8")
+    result = Scanner().scan_mmap(str(path))
+    assert result.matches[0].column == 16
+    assert result.matches[0].start == 16
+
+
+def test_scan_mmap_falls_back_for_utf16(tmp_path):
+    """Test files that are not ASCII-compatible are scanned as text."""
+    path = tmp_path / "wide.txt"
+    path.write_text("Contact: test@example.com", encoding="utf-16")
+    result = Scanner(encoding="utf-16").scan_mmap(str(path))
+    assert [m.value for m in result.matches] == ["test@example.com"]
+
+
+def test_scan_mmap_empty_file(tmp_path):
+    """Test mmap scanning of an empty file."""
+    path = tmp_path / "empty.txt"
+    path.write_text("")
+    result = Scanner().scan_mmap(str(path))
+    assert result.matches == []
+
+
+def test_scan_texts_matches_scan_text():
+    """Test that batch scanning reports what scan_text reports per record."""
+    scanner = Scanner()
+    texts = [
+        "Contact: test@example.com",
+        "nothing here",
+        "SSN: 123-45-6789\ncard 4111111111111111",
+        "",
+        "ssn: 123-45-6789 and mail bob@example.com",
+    ]
+    batch = scanner.scan_texts(texts, ids=["a", "b", "c", "d", "e"])
+    grouped = batch.by_record()
+    for record_id, text in zip("abcde", texts):
+        expected = scanner.scan_text(text).matches
+        got = grouped.get(record_id, [])
+        assert [(m.type, m.value, m.line, m.column, m.confidence, m.context, m.start) for m in got] == \
+            [(m.type, m.value, m.line, m.column, m.confidence, m.context, m.start) for m in expected]
+    assert batch.count == 5
+    assert sum(batch.summary.values()) == len(batch.matches)
+
+
+def test_scan_texts_default_ids_and_small_batches():
+    """Test positional ids and records split across many engine passes."""
+    scanner = Scanner()
+    texts = (f"user{i}@example.com" if i % 3 == 0 else "plain" for i in range(30))
+    batch = scanner.scan_texts(texts, batch_chars=20)
+    assert sorted(set(batch.ids)) == list(range(0, 30, 3))
+
+
+def test_scan_texts_ids_length_mismatch():
+    """Test that ids must line up with the texts."""
+    scanner = Scanner()
+    with pytest.raises(ValueError):
+        scanner.scan_texts(["a", "b"], ids=[1])
+    with pytest.raises(ValueError):
+        scanner.scan_texts(["a"], ids=[1, 2])
+
+
+def test_mask_stream_matches_mask_text():
+    """Test that streamed masking gives the same text as masking it whole."""
+    import io
+    from pii_shield.masker import Masker
+    text = "SSN: 123-45-6789\nmail a@example.com and b@example.com\nnothing here\ncard 4111 1111 1111 1111"
+    scanner = Scanner()
+    masker = Masker()
+    expected, _ = scanner.mask_text(text, masker)
+    assert "".join(scanner.mask_stream(io.StringIO(text), masker)) == expected
+
+
+def test_mask_stream_long_line():
+    """Test that lines longer than a chunk are masked in pieces."""
+    import io
+    from pii_shield.masker import Masker
+    text = " ".join(f"user{i}@example.com" for i in range(500))
+    scanner = Scanner()
+    masker = Masker()
+    pieces = list(scanner.mask_stream(io.StringIO(text), masker, chunk_size=1000))
+    assert len(pieces) > 1
+    assert "".join(pieces) == scanner.mask_text(text, masker)[0]
+
+
+def test_mask_stream_partial_overlaps():
+    """Test that overlapping matches on a long line are masked as by mask_text, wherever it is cut."""
+    import io
+    import random
+    from pii_shield.masker import Masker
+    from pii_shield.models import MaskingStrategy
+    pieces = ["123-45-6789 23914111 1111", "6789 23914111 1111", "555-123-4567", "4111 1111 1111 1111",
+              "1234567890", "card", "ssn:", " ", "-"]
+    rng = random.Random(5)
+    text = "".join(rng.choice(pieces) for _ in range(600))
+    masker = Masker(strategy=MaskingStrategy.FULL)
+    for scanner in (Scanner(threshold=0), Scanner(threshold=0, resolve_overlaps=True)):
+        expected = scanner.mask_text(text, masker)[0]
+        for chunk_size in (29, 235):
+            assert "".join(scanner.mask_stream(io.StringIO(text), masker, chunk_size=chunk_size)) == expected
+
+
+def test_scan_lines_matches_scan_text():
+    """Test that scanning some lines reports what a full scan reports on them."""
+    scanner = Scanner()
+    text = "\n".join(f"row {i}: user{i}@example.com SSN 123-45-{6789 + i}" for i in range(40))
+    full = scanner.scan_text(text)
+    expected = [(m.line, m.column, m.type, m.value, m.confidence, m.context)
+                for m in full.matches if 5 <= m.line <= 7 or m.line == 30]
+    result = scanner.scan_lines(text, [(30, 30), (5, 7), (100, 120)])
+    assert [(m.line, m.column, m.type, m.value, m.confidence, m.context) for m in result.matches] == expected
+    compact = scanner.scan_lines(text, [(5, 7), (30, 30)], compact=True)
+    assert [(m.line, m.value, m.context) for m in compact.matches] == [(e[0], e[3], e[5]) for e in expected]
+
+
+def test_scan_lines_skips_lines_between_nearby_ranges():
+    """Test that unrequested lines between ranges sharing context are not reported."""
+    scanner = Scanner()
+    text = "a@example.com\nSSN: 123-45-6789\nb@example.com\n"
+    result = scanner.scan_lines(text, [(1, 1), (3, 3)])
+    assert [(m.line, m.type) for m in result.matches] == [(1, "EMAIL"), (3, "EMAIL")]
+    # Overlapping ranges report each match once
+    result = scanner.scan_lines(text, [(1, 2), (2, 3)])
+    assert [m.line for m in result.matches] == [1, 2, 3]
@@ -0,0 +1,76 @@
+"""Tests for the findings store."""
+
+import json
+
+from click.testing import CliRunner
+
+from pii_shield.cli import cli
+from pii_shield.scanner import Scanner
+from pii_shield.store import FindingsStore
+
+
+def _record(store, texts):
+    """Scan texts into a new scan of the store and return its id."""
+    scanner = Scanner()
+    scan_id = store.begin_scan("/data", scanner.fingerprint())
+    results = (scanner.scan_text(text, name) for name, text in texts.items())
+    for _ in store.record(scan_id, results):
+        pass
+    store.finish_scan(scan_id)
+    return scan_id
+
+
+def test_store_summary_and_lookup(tmp_path):
+    """Test that recorded findings are counted and found by value."""
+    with FindingsStore(str(tmp_path / "findings.db")) as store:
+        _record(store, {
+            "a.txt": "Contact alice@example.com or bob@example.com",
+            "b.txt": "Email alice@example.com, SSN: 123-45-6789",
+        })
+        assert store.summary()["EMAIL"] == 3
+        assert store.top_files(1) == [("a.txt", 2)]
+        found = list(store.find(value="alice@example.com"))
+        assert sorted(f["file"] for f in found) == ["a.txt", "b.txt"]
+        assert list(store.find(value="carol@example.com")) == []
+        assert [f["file"] for f in store.find(pii_type="EMAIL", file="b.*")] == ["b.txt"]
+
+
+def test_store_keeps_scans_apart(tmp_path):
+    """Test that findings can be restricted to one scan."""
+    path = str(tmp_path / "findings.db")
+    with FindingsStore(path) as store:
+        first = _record(store, {"a.txt": "alice@example.com"})
+    with FindingsStore(path) as store:
+        second = _record(store, {"a.txt": "alice@example.com bob@example.com"})
+        assert store.latest_scan() == second
+        assert store.summary(first)["EMAIL"] == 1
+        assert store.summary(second)["EMAIL"] == 2
+        assert len(list(store.find(value="alice@example.com"))) == 2
+        assert [s["findings"] for s in store.scans()] == [1, 2]
+
+
+def test_store_does_not_keep_values(tmp_path):
+    """Test that matched values are stored only as fingerprints."""
+    path = tmp_path / "findings.db"
+    with FindingsStore(str(path)) as store:
+        _record(store, {"a.txt": "SSN: 123-45-6789"})
+    assert b"123-45-6789" not in path.read_bytes()
+
+
+def test_cli_scan_store_and_query(tmp_path):
+    """Test scan --store followed by the query command."""
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data" / "users.txt").write_text("alice@example.com\n")
+    db = str(tmp_path / "findings.db")
+    runner = CliRunner()
+    result = runner.invoke(cli, ['scan', '--store', db, '--no-cache', str(tmp_path / "data")])
+    assert result.exit_code == 1
+    assert 'alice@example.com' in result.output
+
+    result = runner.invoke(cli, ['query', db, '--format', 'json'])
+    assert result.exit_code == 0
+    assert json.loads(result.output)["summary"] == {"EMAIL": 1}
+
+    result = runner.invoke(cli, ['query', db, '--value', 'alice@example.com'])
+    assert result.exit_code == 0
+    assert 'users.txt:1:0' in result.output
@@ -0,0 +1,53 @@
+"""Tests for tokenizer and line index."""
+
+from pii_shield.tokenizer import Tokenizer, LineIndex
+
+
+def test_context_window():
+    """Test context window extraction."""
+    tokenizer = Tokenizer()
+    text = "The email is test@example.com here"
+    context = tokenizer.get_context_window(text, 13, 29)
+    assert "test@example.com" in context
+
+
+def test_line_index_locate():
+    """Test offsets map to 1-based lines and 0-based columns."""
+    index = LineIndex("abc\ndef\n\nghi")
+    assert index.locate(0) == (1, 0)
+    assert index.locate(2) == (1, 2)
+    assert index.locate(4) == (2, 0)
+    assert index.locate(8) == (3, 0)
+    assert index.locate(11) == (4, 2)
+
+
+def test_line_index_round_trip():
+    """Test offset() is the inverse of locate()."""
+    text = "first line\nsecond\n\nfourth line here"
+    index = LineIndex(text)
+    for offset in range(len(text)):
+        assert index.offset(*index.locate(offset)) == offset
+
+
+def test_line_index_line_bounds():
+    """Test line start and end offsets."""
+    text = "abc\ndef\nghi"
+    index = LineIndex(text)
+    assert len(index) == 3
+    assert text[index.line_start(2):index.line_end(2)] == "def"
+    assert text[index.line_start(3):index.line_end(3)] == "ghi"
+
+
+def test_line_index_empty_text():
+    """Test line index on empty text."""
+    index = LineIndex("")
+    assert len(index) == 1
+    assert index.locate(0) == (1, 0)
+
+
+def test_context_window_configurable():
+    """Test window size and truncation settings."""
+    text = "a" * 100 + "SECRET" + "b" * 100
+    tokenizer = Tokenizer(window_size=5, max_length=None)
+    assert tokenizer.get_context_window(text, 100, 106) == "aaaaaSECRETbbbbb"
+    assert Tokenizer(window_size=50, max_length=10).get_context_window(text, 100, 106) == "a" * 10 + "..."
@@ -1,11 +1,39 @@
 """Minimal tests for validators."""
 
+import random
+
+import pytest
+
+from pii_shield import validators
 from pii_shield.validators import (
     luhn_check, email_domain_check, ssn_format_validation,
-    iban_checksum, api_key_entropy_check
+    iban_checksum, api_key_entropy_check, luhn_check_many, iban_checksum_many
 )
 
 
+def _card_candidates():
+    """Card-like strings: valid, invalid, separated, too short or long, and non-ASCII digits."""
+    rng = random.Random(7)
+    cards = ["4532015112830366", "4532-0151-1283-0366", "4532 0151 1283 0366", "1234567890123456",
+             "453201511283", "45320151128303661234", "4532015112830366x", "", "\u0664532015112830366",
+             "0000000000000", "79927398713" + "00"]
+    for _ in range(200):
+        cards.append("".join(rng.choice("0123456789") for _ in range(rng.randint(12, 20))))
+    return cards
+
+
+def _iban_candidates():
+    """IBAN-like strings: valid, invalid, lowercase, too short or long, and malformed."""
+    rng = random.Random(7)
+    ibans = ["DE89370400440532013000", "GB82WEST12345698765432", "gb82west12345698765432",
+             "DE89370400440532013001", "AB12", "AB" + "1" * 50, "1234567890123456", "DE89 3704 0044 0532 01",
+             "MT84MALT011000012345MTLCAST001S", "DE8937040044053201300\u0661"]
+    for _ in range(200):
+        body = "".join(rng.choice("0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(rng.randint(11, 30)))
+        ibans.append(rng.choice(["DE", "GB", "FR", "NL"]) + "%02d" % rng.randint(0, 99) + body)
+    return ibans
+
+
 def test_luhn_check():
     """Test Luhn algorithm."""
     assert luhn_check("4532015112830366") is True
@@ -148,3 +176,29 @@ def test_api_key_entropy_check_short():
     """Test API key entropy check rejects short strings."""
     assert api_key_entropy_check("short") is False
     assert api_key_entropy_check("abc") is False
+
+
+@pytest.mark.parametrize("numpy", [True, False])
+def test_luhn_check_many_matches_luhn_check(monkeypatch, numpy):
+    """Test batch Luhn validation agrees with luhn_check, with and without NumPy."""
+    if numpy and validators.np is None:
+        pytest.skip("NumPy is not installed")
+    if not numpy:
+        monkeypatch.setattr(validators, "np", None)
+    cards = _card_candidates()
+    assert luhn_check_many(cards) == [luhn_check(card) for card in cards]
+    assert luhn_check_many(cards[:3]) == [True, True, True]
+    assert luhn_check_many([]) == []
+
+
+@pytest.mark.parametrize("numpy", [True, False])
+def test_iban_checksum_many_matches_iban_checksum(monkeypatch, numpy):
+    """Test batch IBAN validation agrees with iban_checksum, with and without NumPy."""
+    if numpy and validators.np is None:
+        pytest.skip("NumPy is not installed")
+    if not numpy:
+        monkeypatch.setattr(validators, "np", None)
+    ibans = _iban_candidates()
+    assert iban_checksum_many(ibans) == [iban_checksum(iban) for iban in ibans]
+    assert iban_checksum_many(ibans[:3]) == [True, True, True]
+    assert iban_checksum_many([]) == []
@@ -0,0 +1,78 @@
+"""Tests for the token vault."""
+
+import multiprocessing
+
+import pytest
+
+from pii_shield.masker import Masker
+from pii_shield.models import MaskingStrategy
+from pii_shield.vault import TokenVault, shared_vault
+
+
+def test_token_is_stable():
+    """Test that a value always gets the same token."""
+    vault = TokenVault()
+    token = vault.token("EMAIL", "a@example.com")
+    assert vault.token("EMAIL", "a@example.com") == token
+    assert vault.token("EMAIL", "b@example.com") != token
+    assert vault.token("SSN", "a@example.com") != token
+    assert token.startswith("TOKEN_EMAIL_")
+
+
+def test_detokenize_round_trip():
+    """Test that masked text is restored by detokenize."""
+    vault = TokenVault()
+    masker = Masker(strategy=MaskingStrategy.TOKEN, vault=vault)
+    masked = masker.mask("a@example.com", "EMAIL") + " and " + masker.mask("123-45-6789", "SSN")
+    assert vault.detokenize(masked) == "a@example.com and 123-45-6789"
+    assert vault.detokenize("TOKEN_EMAIL_00000000000000000000") == "TOKEN_EMAIL_00000000000000000000"
+
+
+def test_vault_persists(tmp_path):
+    """Test that tokens survive reopening the vault and match across instances."""
+    path = str(tmp_path / "vault.db")
+    with TokenVault(path) as vault:
+        token = vault.token("EMAIL", "a@example.com")
+    other = TokenVault(path)
+    assert other.lookup(token) == ("EMAIL", "a@example.com")
+    assert other.token("EMAIL", "a@example.com") == token
+    other.close()
+
+
+def test_masker_tokens_consistent():
+    """Test that repeated values get the same token within a masker."""
+    masker = Masker(strategy=MaskingStrategy.TOKEN)
+    values = ["a@example.com", "b@example.com", "a@example.com"]
+    tokens = masker.mask_many(values, ["EMAIL"] * 3)
+    assert tokens[0] == tokens[2]
+    assert tokens[0] != tokens[1]
+
+
+def test_token_replace_signatures():
+    """Test that token_replace keeps its argument-free form alongside vault tokens."""
+    masker = Masker(strategy=MaskingStrategy.TOKEN)
+    assert masker.token_replace() == "PLACEHOLDER_1"
+    assert masker.token_replace() == "PLACEHOLDER_2"
+    token = masker.token_replace("a@example.com", "EMAIL")
+    assert token == masker.vault.token("EMAIL", "a@example.com")
+    assert masker.token_replace("a@example.com", pii_type="EMAIL") == token
+
+
+def _vault_in_child(path, parent_id, queue):
+    """Report whether a forked process got the parent's vault object."""
+    queue.put(id(shared_vault(path)) == parent_id)
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs fork")
+def test_shared_vault_not_inherited_across_fork(tmp_path):
+    """Test that a forked worker opens its own vault connection."""
+    path = str(tmp_path / "vault.db")
+    parent = shared_vault(path)
+    assert shared_vault(path) is parent
+    context = multiprocessing.get_context("fork")
+    queue = context.Queue()
+    child = context.Process(target=_vault_in_child, args=(path, id(parent), queue))
+    child.start()
+    inherited = queue.get(timeout=30)
+    child.join()
+    assert inherited is False
@@ -0,0 +1,76 @@
+"""Tests for the directory walker."""
+
+import os
+
+from pii_shield.scanner import Scanner
+from pii_shield.walker import parse_patterns, walk_files
+
+
+def _tree(root, files):
+    for name, content in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+    return root
+
+
+def _walk(root, **kwargs):
+    return sorted(os.path.relpath(p, root).replace(os.sep, '/') for p in walk_files(str(root), **kwargs))
+
+
+def test_walk_prunes_ignored_directories(tmp_path):
+    """Test that ignored directories are skipped by name, not by substring."""
+    _tree(tmp_path, {
+        "src/a.txt": b"a", "node_modules/x/b.js": b"b", ".git/HEAD": b"c",
+        "rebuild/c.txt": b"c", "build.gradle": b"d",
+    })
+    assert _walk(tmp_path) == ["build.gradle", "rebuild/c.txt", "src/a.txt"]
+
+
+def test_walk_gitignore(tmp_path):
+    """Test .gitignore rules: anchoring, directory-only rules, negation and nesting."""
+    _tree(tmp_path, {
+        ".gitignore": b"*.log\n/top.txt\nout/\n!keep.log\n",
+        "app.log": b"", "keep.log": b"", "top.txt": b"", "sub/top.txt": b"",
+        "out/x.txt": b"", "sub/out": b"", "sub/.gitignore": b"secret*\n", "sub/secret.env": b"",
+        "deep/a/b/c.txt": b"",
+    })
+    assert _walk(tmp_path) == sorted([
+        ".gitignore", "app.log", "deep/a/b/c.txt", "keep.log", "out/x.txt", "sub/.gitignore",
+        "sub/out", "sub/secret.env", "sub/top.txt", "top.txt",
+    ])
+    assert _walk(tmp_path, gitignore=True) == [
+        ".gitignore", "deep/a/b/c.txt", "keep.log", "sub/.gitignore", "sub/out", "sub/top.txt",
+    ]
+    assert _walk(tmp_path, ignore=["deep/**/*.txt", "sub"]) == sorted([
+        ".gitignore", "app.log", "keep.log", "out/x.txt", "top.txt",
+    ])
+
+
+def test_parse_patterns_syntax():
+    """Test comments, escapes and wildcards in ignore patterns."""
+    rules = parse_patterns(["# comment", "", "\\#hash", "a?c", "[!x]y", "doc/**"])
+    assert [r.anchored for r in rules] == [False, False, False, True]
+    assert rules[0].regex.match("#hash")
+    assert rules[1].regex.match("abc") and not rules[1].regex.match("a/c")
+    assert rules[2].regex.match("zy") and not rules[2].regex.match("xy")
+    assert rules[3].regex.match("doc/a/b") and not rules[3].regex.match("doc")
+
+
+def test_scan_directory_skips_binary_and_excluded(tmp_path):
+    """Test that binary files and ignore patterns are left out of directory scans."""
+    _tree(tmp_path, {
+        "a.txt": b"alice@example.com\n", "b.bin": b"bob@example.com\0\xff\n",
+        "fixtures/c.txt": b"carol@example.com\n",
+    })
+    results = Scanner(ignore_patterns=["fixtures/"]).scan_directory(str(tmp_path))
+    assert [os.path.basename(r.file) for r in results] == ["a.txt"]
+
+
+def test_walk_gitignore_above_root(tmp_path):
+    """Test that ignore files between the repository root and the walked directory apply."""
+    _tree(tmp_path, {
+        ".git/info/exclude": b"*.tmp\n", ".gitignore": b"*.secret\n/sub/gen/\n",
+        "sub/a.txt": b"", "sub/b.secret": b"", "sub/c.tmp": b"", "sub/gen/d.txt": b"",
+    })
+    assert _walk(tmp_path / "sub", gitignore=True) == ["a.txt"]